@@ -12,8 +12,9 @@ Builds a dependency graph of .tex files and classifies each as:
 
 import os
 import re
+from functools import lru_cache
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Callable, Dict, List, Optional, Set, Tuple
 from .logging_utils import logger
 
 
@@ -105,7 +106,11 @@ def _find_all_tex_files(source_dir: str) -> List[str]:
     return result
 
 
-def _find_main_tex(source_dir: str, all_tex: List[str]) -> Optional[str]:
+def _find_main_tex(
+    source_dir: str,
+    all_tex: List[str],
+    read: Callable[[str], str] = _read_file,
+) -> Optional[str]:
     r"""
     Find the true main .tex file:
     Must have BOTH \documentclass AND \begin{document}.
@@ -113,7 +118,7 @@ def _find_main_tex(source_dir: str, all_tex: List[str]) -> Optional[str]:
     """
     candidates = []
     for path in all_tex:
-        content = _read_file(path)
+        content = read(path)
         if _RE_DOCUMENTCLASS.search(content) and _RE_BEGIN_DOCUMENT.search(content):
             candidates.append(path)
 
@@ -122,7 +127,7 @@ def _find_main_tex(source_dir: str, all_tex: List[str]) -> Optional[str]:
         # Fallback: file with \documentclass in top-level dir
         top_level = [p for p in all_tex if os.path.dirname(p) == os.path.abspath(source_dir)]
         for p in top_level:
-            c = _read_file(p)
+            c = read(p)
             if _RE_DOCUMENTCLASS.search(c):
                 return p
         return all_tex[0] if all_tex else None
@@ -146,6 +151,8 @@ def _build_dependency_graph(
     main_tex: str,
     source_dir: str,
     all_tex_set: Set[str],
+    read: Callable[[str], str] = _read_file,
+    resolve: Callable[[str, str, str], Optional[str]] = _resolve_input,
 ) -> Dict[str, Set[str]]:
     r"""
     BFS/DFS from main_tex, following \input and \include.
@@ -160,12 +167,12 @@ def _build_dependency_graph(
         if current in visited:
             continue
         visited.add(current)
-        content = _read_file(current)
+        content = read(current)
         from_dir = os.path.dirname(current)
         deps: Set[str] = set()
         for m in _RE_INPUT.finditer(content):
             ref = m.group(1).strip()
-            resolved = _resolve_input(ref, from_dir, source_dir)
+            resolved = resolve(ref, from_dir, source_dir)
             if resolved and resolved in all_tex_set:
                 deps.add(resolved)
                 if resolved not in visited:
@@ -175,9 +182,9 @@ def _build_dependency_graph(
     return graph
 
 
-def _extract_preamble(main_tex_path: str) -> str:
+def _extract_preamble(main_tex_path: str, read: Callable[[str], str] = _read_file) -> str:
     r"""Extract everything before \begin{document} from the main tex file."""
-    content = _read_file(main_tex_path)
+    content = read(main_tex_path)
     m = _RE_BEGIN_DOCUMENT.search(content)
     if m:
         return content[:m.start()]
@@ -193,29 +200,34 @@ class PaperAnalyzer:
     def analyze(self) -> PaperStructure:
         logger.info(f"Analyzing paper structure in: {self.source_dir}")
 
+        # Every phase below revisits the same files and \input refs; read and
+        # resolve each one once per analysis.
+        read = lru_cache(maxsize=None)(_read_file)
+        resolve = lru_cache(maxsize=None)(_resolve_input)
+
         # 1. Collect all .tex files
         all_tex = _find_all_tex_files(self.source_dir)
         all_tex_set = set(all_tex)
         logger.info(f"Found {len(all_tex)} .tex files total")
 
         # 2. Find main .tex
-        main_tex = _find_main_tex(self.source_dir, all_tex)
+        main_tex = _find_main_tex(self.source_dir, all_tex, read)
         if not main_tex:
             raise FileNotFoundError("No .tex files found in source directory.")
         logger.info(f"Main tex identified: {os.path.relpath(main_tex, self.source_dir)}")
 
         # 3. Build dependency graph from main
-        graph = _build_dependency_graph(main_tex, self.source_dir, all_tex_set)
+        graph = _build_dependency_graph(main_tex, self.source_dir, all_tex_set, read, resolve)
         reachable_from_main = set(graph.keys())
 
         # 4. Classify each file
         files: Dict[str, FileInfo] = {}
         for path in all_tex:
-            content = _read_file(path)
+            content = read(path)
             rel = os.path.relpath(path, self.source_dir)
             inputs_resolved = [
                 r for ref in (_RE_INPUT.findall(content))
-                for r in [_resolve_input(ref, os.path.dirname(path), self.source_dir)]
+                for r in [resolve(ref, os.path.dirname(path), self.source_dir)]
                 if r is not None
             ]
 
@@ -251,7 +263,7 @@ class PaperAnalyzer:
             logger.debug(f"  {rel} → {info.file_type}")
 
         # 5. Extract preamble
-        preamble = _extract_preamble(main_tex)
+        preamble = _extract_preamble(main_tex, read)
 
         structure = PaperStructure(
             source_dir=self.source_dir,
@@ -13,6 +13,7 @@ import subprocess
 import os
 import re
 import shutil
+import tempfile
 from typing import Optional, Tuple
 from .logging_utils import logger
 
@@ -104,9 +105,12 @@ def ai_fix_file(file_path: str, error_snippet: str, api_key: str, model_name: st
     else:
         fix_prompt = "You are a LaTeX expert. Fix the compilation error in the file. Output ONLY the corrected LaTeX."
 
+    # Stable-first layout for Gemini's implicit prefix caching: the system
+    # prompt, then the (large, mostly unchanged between fix attempts) file,
+    # then the error snippet that differs on every attempt.
     user_content = (
-        f"## Error Log\n```\n{error_snippet}\n```\n\n"
-        f"## LaTeX File (`{os.path.basename(file_path)}`)\n```latex\n{original_content}\n```\n"
+        f"## LaTeX File (`{os.path.basename(file_path)}`)\n```latex\n{original_content}\n```\n\n"
+        f"## Error Log\n```\n{error_snippet}\n```\n"
     )
 
     try:
@@ -165,8 +169,6 @@ def compile_pdf(
     Returns:
         (success: bool, error_log: str)
     """
-    cwd = os.getcwd()
-    os.chdir(source_dir)
     rel_tex_file = os.path.basename(main_tex_file)
     logger.info(f"Compiling {rel_tex_file} in {source_dir} (timeout={timeout}s)...")
 
@@ -213,22 +215,21 @@ def compile_pdf(
                 rel_tex_file
             ]
 
-        result = subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            timeout=timeout,
-        )
-
-        # Decode manually with errors='replace' — pdflatex output can contain
-        # non-UTF-8 bytes (CJK font references, binary encoding markers) that
-        # would cause UnicodeDecodeError if decoded with text=True.
-        combined_log = (
-            result.stdout.decode('utf-8', errors='replace') + "\n" +
-            result.stderr.decode('utf-8', errors='replace')
-        )
-
-        pdf_name = rel_tex_file.replace(".tex", ".pdf")
+        # latexmk output goes to temp files rather than pipes: only the tail
+        # is ever used, so a huge log on a complex paper is never held in
+        # memory. Decoded with errors='replace' — pdflatex output can contain
+        # non-UTF-8 bytes (CJK font references, binary encoding markers).
+        with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+            result = subprocess.run(
+                cmd,
+                cwd=source_dir,
+                stdout=out,
+                stderr=err,
+                timeout=timeout,
+            )
+            combined_log = _read_tail(out, 8192) + "\n" + _read_tail(err, 8192)
+
+        pdf_name = os.path.join(source_dir, rel_tex_file.replace(".tex", ".pdf"))
         if os.path.exists(pdf_name):
             if result.returncode != 0:
                 logger.warning(f"Compilation succeeded with warnings (rc={result.returncode})")
@@ -246,8 +247,13 @@ def compile_pdf(
     except Exception as e:
         logger.error(f"Compiler error: {e}")
         return False, str(e)
-    finally:
-        os.chdir(cwd)
+
+
+def _read_tail(f, nbytes: int) -> str:
+    """Return the last `nbytes` of a binary file object, decoded leniently."""
+    f.seek(0, os.SEEK_END)
+    f.seek(max(0, f.tell() - nbytes))
+    return f.read().decode('utf-8', errors='replace')
 
 
 # ── Error-Driven Compile+Fix Loop ────────────────────────────────────────────
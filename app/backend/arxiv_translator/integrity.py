@@ -7,7 +7,41 @@ polluting the cache.
 """
 
 import re
-from typing import Tuple
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+
+
+_RE_BEGIN = re.compile(r"\\begin\{(\w+)\}")
+_RE_END = re.compile(r"\\end\{(\w+)\}")
+_RE_SECTION = re.compile(r"\\(?:sub)*section\*?\{")
+_RE_CITE = re.compile(r"\\cite\{")
+_RE_REF = re.compile(r"\\ref\{")
+_RE_LABEL = re.compile(r"\\label\{")
+
+
+class _Structure(NamedTuple):
+    begins: int
+    ends: int
+    sections: int
+    cites: int
+    refs: int
+    labels: int
+
+
+def _count_structure(text: str) -> _Structure:
+    return _Structure(
+        begins=len(_RE_BEGIN.findall(text)),
+        ends=len(_RE_END.findall(text)),
+        sections=len(_RE_SECTION.findall(text)),
+        cites=len(_RE_CITE.findall(text)),
+        refs=len(_RE_REF.findall(text)),
+        labels=len(_RE_LABEL.findall(text)),
+    )
+
+
+# The original stays the same across a file's retry attempts, so its counts are
+# computed once; translated text differs every attempt and is never cached.
+_original_structure = lru_cache(maxsize=32)(_count_structure)
 
 
 def validate_translation(
@@ -35,11 +69,13 @@ def validate_translation(
     if r"\begin{document}" in original and r"\begin{document}" not in translated:
         return False, r"Missing \begin{document} in translation"
 
+    orig = _original_structure(original)
+    trans = _count_structure(translated)
+
     # Check \begin{env} / \end{env} pairing counts are roughly balanced
-    orig_begins = len(re.findall(r"\\begin\{(\w+)\}", original))
-    orig_ends = len(re.findall(r"\\end\{(\w+)\}", original))
-    trans_begins = len(re.findall(r"\\begin\{(\w+)\}", translated))
-    trans_ends = len(re.findall(r"\\end\{(\w+)\}", translated))
+    orig_begins = orig.begins
+    trans_begins = trans.begins
+    trans_ends = trans.ends
 
     # The translated file should have similar environment counts
     # Allow some tolerance (±20%) since the model might merge/split some envs
@@ -60,8 +96,8 @@ def validate_translation(
 
     # ── Layer 3: Key structure preservation ────────────────────────────────
     # \section / \subsection counts should match exactly
-    orig_sections = len(re.findall(r"\\(?:sub)*section\*?\{", original))
-    trans_sections = len(re.findall(r"\\(?:sub)*section\*?\{", translated))
+    orig_sections = orig.sections
+    trans_sections = trans.sections
     if orig_sections > 0 and trans_sections != orig_sections:
         # Allow ±1 tolerance for edge cases (model might consolidate)
         if abs(orig_sections - trans_sections) > 1:
@@ -71,13 +107,14 @@ def validate_translation(
             )
 
     # \cite, \ref, \label counts should not drop significantly
-    for cmd in (r"\\cite\{", r"\\ref\{", r"\\label\{"):
-        orig_count = len(re.findall(cmd, original))
-        trans_count = len(re.findall(cmd, translated))
+    for cmd_name, orig_count, trans_count in (
+        (r"\cite", orig.cites, trans.cites),
+        (r"\ref", orig.refs, trans.refs),
+        (r"\label", orig.labels, trans.labels),
+    ):
         if orig_count > 3:  # Only check if there's a meaningful number
             drop_pct = (orig_count - trans_count) / orig_count
             if drop_pct > 0.15:  # More than 15% lost
-                cmd_name = cmd.replace("\\\\", "\\").rstrip(r"\{")
                 return False, (
                     f"{cmd_name} count dropped significantly: "
                     f"original {orig_count}, translated {trans_count} "
@@ -4,6 +4,28 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# ── Patterns (compiled once; the cleaner runs over every .tex file) ──────────
+
+_COMMENT_ENV_RE = re.compile(r'\\begin\{comment\}.*?\\end\{comment\}', re.DOTALL)
+_FULL_LINE_COMMENT_RE = re.compile(r'\n\s*%.*?(?=\n)')
+_INLINE_COMMENT_RE = re.compile(r'%.*?(?=\n)')
+_MATH_CODE = "ZZLATEXGUARD"
+
+# \newcommand{\name}[n_args]{body} or \newcommand{\name}{body}
+_NEWCMD_RE = re.compile(
+    r'\\(?:newcommand|renewcommand)\s*\{\\([a-zA-Z]+)\}\s*(?:\[(\d+)\])?\s*\{((?:[^{}]|\{[^{}]*\})*)\}',
+    re.DOTALL
+)
+
+# \usepackage[opt]{name} or \usepackage{name}
+_USEPACKAGE_RE = re.compile(r'\\usepackage(?:\[.*?\])?\{(.*?)\}')
+
+# Environments fix_latex_imbalance checks, with their (begin, end) tag patterns
+_IMBALANCE_ENVS = {
+    env: (re.compile(r'\\begin\{' + env + r'\}'), re.compile(r'\\end\{' + env + r'\}'))
+    for env in ['quote', 'quotation', 'itemize', 'enumerate', 'description', 'definition', 'theorem', 'lemma', 'proof']
+}
+
 def clean_latex_content(content: str) -> str:
     """
     Removes LaTeX comments to reduce token count.
@@ -18,22 +40,17 @@ def clean_latex_content(content: str) -> str:
     original = content
 
     # 1. Remove 'comment' environments
-    comment_env_pattern = re.compile(
-        r'\\begin\{comment\}.*?\\end\{comment\}',
-        re.DOTALL
-    )
-    content = comment_env_pattern.sub('', content)
+    content = _COMMENT_ENV_RE.sub('', content)
 
     # 2. Smart comment removal (ported from MathTranslate)
     #    Temporarily encode \\\\ and \\% to prevent false matches.
-    _MATH_CODE = "ZZLATEXGUARD"
     content = content.replace('\\\\', f'{_MATH_CODE}_BSLASH')
     content = content.replace('\\%', f'{_MATH_CODE}_PCNT')
 
     # Remove full-line comments (lines starting with %)
-    content = re.sub(r'\n\s*%.*?(?=\n)', '', content)
+    content = _FULL_LINE_COMMENT_RE.sub('', content)
     # Remove trailing inline comments (% to end of line)
-    content = re.sub(r'%.*?(?=\n)', '', content)
+    content = _INLINE_COMMENT_RE.sub('', content)
 
     # Restore encoded chars
     content = content.replace(f'{_MATH_CODE}_PCNT', '\\%')
@@ -69,13 +86,7 @@ def expand_newcommands(content: str) -> str:
         'caption', 'footnote',
     ]
 
-    # Pattern: \newcommand{\name}[n_args]{body} or \newcommand{\name}{body}
-    newcmd_pattern = re.compile(
-        r'\\(?:newcommand|renewcommand)\s*\{\\([a-zA-Z]+)\}\s*(?:\[(\d+)\])?\s*\{((?:[^{}]|\{[^{}]*\})*)\}',
-        re.DOTALL
-    )
-
-    matches = list(newcmd_pattern.finditer(content))
+    matches = list(_NEWCMD_RE.finditer(content))
     expanded_count = 0
 
     for match in matches:
@@ -121,10 +132,8 @@ def fix_package_conflicts(content: str) -> str:
     Reorders packages to prevent known LaTeX conflicts.
     1. Ensures 'colortbl' is loaded BEFORE 'booktabs'.
     """
-    # Regex to capture usepackage lines
     # We want to identify if booktabs and colortbl exist
-    # Pattern: \usepackage[opt]{name} or \usepackage{name}
-    pkg_pattern = re.compile(r'\\usepackage(?:\[.*?\])?\{(.*?)\}')
+    pkg_pattern = _USEPACKAGE_RE
     
     # Check for presence
     has_booktabs = 'booktabs' in content
@@ -195,14 +204,7 @@ def fix_latex_imbalance(content: str) -> str:
     Heuristic fix for extra \\end{...} tags which cause 'Extra \\endgroup' errors.
     Common scenario: LLM auto-completes an environment in a chunk, creating duplicates.
     """
-    # Environments to check
-    envs = ['quote', 'quotation', 'itemize', 'enumerate', 'description', 'definition', 'theorem', 'lemma', 'proof']
-    
-    for env in envs:
-        # Regex for begin and end tags
-        begin_pat = re.compile(r'\\begin\{' + env + r'\}')
-        end_pat = re.compile(r'\\end\{' + env + r'\}')
-        
+    for env, (begin_pat, end_pat) in _IMBALANCE_ENVS.items():
         starts = len(begin_pat.findall(content))
         ends = len(end_pat.findall(content))
         
@@ -195,11 +195,13 @@ def main():
                         main_tex_path=main_tex,
                     )
 
-            tasks = [
-                guarded_translate(f, i + 1)
-                for i, f in enumerate(translatable)
-            ]
-            return await asyncio.gather(*tasks)
+            # One client (and connection pool) serves every file in the run
+            async with translator:
+                tasks = [
+                    guarded_translate(f, i + 1)
+                    for i, f in enumerate(translatable)
+                ]
+                return await asyncio.gather(*tasks)
 
         results = asyncio.run(run_all())
 
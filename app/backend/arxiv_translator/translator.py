@@ -63,6 +63,14 @@ class GeminiTranslator:
                 "Output ONLY the translated LaTeX code, no markdown fences."
             )
 
+    async def __aenter__(self) -> "GeminiTranslator":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        # The async client pools its HTTP connections on the running loop;
+        # close them there instead of leaking them when asyncio.run() ends.
+        await self._client.aio.aclose()
+
     async def translate_file(
         self,
         content: str,
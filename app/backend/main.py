@@ -2,7 +2,14 @@ import os
 import sys
 import shutil
 import asyncio
+import logging
 import subprocess
+import json
+import time
+import hashlib
+import itertools
+import threading
+import orjson
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -18,7 +25,7 @@ except ImportError as e:
     # continue to let it fail later or explore why
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Request
-from fastapi.responses import FileResponse, JSONResponse, RedirectResponse, Response, StreamingResponse
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse, RedirectResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Dict, TypedDict, Optional, List
@@ -32,14 +39,24 @@ from .logging_config import setup_logger
 
 logger = setup_logger("main_api")
 
-app = FastAPI()
+# orjson serializes /library, /tasks and /status payloads straight to bytes
+app = FastAPI(default_response_class=ORJSONResponse)
+
+# Concrete origin list (comma-separated) instead of "*": a wildcard origin
+# combined with allow_credentials=True lets any site make credentialed calls.
+# The frontend normally reaches us through its server-side /api/backend proxy,
+# so this only governs direct browser access to the backend.
+FRONTEND_ORIGINS = [
+    o.strip() for o in os.getenv("FRONTEND_ORIGIN", "http://localhost:3000").split(",") if o.strip()
+]
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"], # Allow all for dev
+    allow_origins=FRONTEND_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=86400,
 )
 
 # Status structure
@@ -75,6 +92,9 @@ def _status_key_to_gcs_path(task_key: str) -> str:
 def _read_task_status(task_key: str) -> dict:
     """Read status from GCS (or in-memory dict)."""
     if STORAGE_TYPE == "gcs" and GCS_BUCKET_NAME:
+        unflushed = _STATUS_UNFLUSHED.get(task_key)
+        if unflushed is not None:
+            return unflushed[1]
         import json
         from google.cloud import storage as gcs_lib
         from google.api_core.exceptions import NotFound
@@ -111,22 +131,88 @@ def _get_executor():
     return _STATUS_EXECUTOR
 
 
-def _write_task_status(task_key: str, data: dict) -> None:
-    """Write status to GCS (non-blocking fire-and-forget) or in-memory."""
-    if STORAGE_TYPE == "gcs" and GCS_BUCKET_NAME:
-        import json
+# GCS mode: statuses written on this instance whose upload has not landed yet,
+# task_key -> (seq, data). Reads here see them first, so /status and the event
+# stream on this instance never lag behind the fire-and-forget upload.
+_STATUS_UNFLUSHED: Dict[str, tuple] = {}
+_STATUS_SEQ = itertools.count(1)
+_STATUS_STATE_LOCK = threading.Lock()
+# Uploads for one task apply in seq order: the newest seq uploaded per task, and
+# striped locks so two uploads for the same task never run concurrently.
+_STATUS_UPLOADED_SEQ: Dict[str, int] = {}
+_STATUS_UPLOAD_LOCKS = [threading.Lock() for _ in range(16)]
+
+
+def _upload_task_status(task_key: str, seq: int, data: dict) -> None:
+    """Upload one status version to GCS unless a newer one already landed. Blocking."""
+    with _STATUS_UPLOAD_LOCKS[hash(task_key) % len(_STATUS_UPLOAD_LOCKS)]:
+        if seq <= _STATUS_UPLOADED_SEQ.get(task_key, 0):
+            return
+        try:
+            client = _get_gcs_client()
+            blob = client.bucket(GCS_BUCKET_NAME).blob(_status_key_to_gcs_path(task_key))
+            blob.upload_from_string(json.dumps(data), content_type="application/json")
+        except Exception as e:
+            # Stays in _STATUS_UNFLUSHED: this instance keeps serving it.
+            logger.warning(f"GCS status write error for {task_key}: {e}")
+            return
+        _STATUS_UPLOADED_SEQ[task_key] = max(seq, _STATUS_UPLOADED_SEQ.get(task_key, 0))
+    with _STATUS_STATE_LOCK:
+        unflushed = _STATUS_UNFLUSHED.get(task_key)
+        if unflushed is not None and unflushed[0] <= seq:
+            del _STATUS_UNFLUSHED[task_key]
+
+
+# Pending deferred flushes of coalesced (persist=False) updates: task_key -> Timer
+_STATUS_FLUSH_TIMERS: Dict[str, threading.Timer] = {}
 
-        def _do_write():
-            try:
-                client = _get_gcs_client()
-                blob = client.bucket(GCS_BUCKET_NAME).blob(_status_key_to_gcs_path(task_key))
-                blob.upload_from_string(json.dumps(data), content_type="application/json")
-            except Exception as e:
-                logger.warning(f"GCS status write error for {task_key}: {e}")
 
-        _get_executor().submit(_do_write)  # fire-and-forget
+def _flush_unflushed_status(task_key: str) -> None:
+    """Upload whatever status is still unflushed for task_key (timer callback)."""
+    with _STATUS_STATE_LOCK:
+        _STATUS_FLUSH_TIMERS.pop(task_key, None)
+        unflushed = _STATUS_UNFLUSHED.get(task_key)
+    if unflushed is not None:
+        _get_executor().submit(_upload_task_status, task_key, *unflushed)
+
+
+def _write_task_status(task_key: str, data: dict, persist: bool = True) -> None:
+    """
+    Write status to GCS (non-blocking fire-and-forget) or in-memory.
+    With persist=False (coalesced updates) the GCS upload is deferred: the
+    update is served locally at once and uploaded after _STATUS_FLUSH_INTERVAL
+    unless a newer write has superseded it by then.
+    """
+    if STORAGE_TYPE == "gcs" and GCS_BUCKET_NAME:
+        with _STATUS_STATE_LOCK:
+            seq = next(_STATUS_SEQ)
+            _STATUS_UNFLUSHED[task_key] = (seq, data)
+            if not persist and task_key not in _STATUS_FLUSH_TIMERS:
+                timer = threading.Timer(_STATUS_FLUSH_INTERVAL, _flush_unflushed_status, args=(task_key,))
+                timer.daemon = True
+                _STATUS_FLUSH_TIMERS[task_key] = timer
+                timer.start()
+        if persist:
+            _get_executor().submit(_upload_task_status, task_key, seq, data)  # fire-and-forget
     else:
         _LOCAL_TASK_STATUS[task_key] = data
+    # Waiters on this instance re-read through _read_task_status, which already
+    # returns `data` here even while the GCS upload is still in flight.
+    _notify_status_waiters(task_key)
+
+
+# /status/{id}/events subscribers on this instance: task_key -> {(loop, event)}.
+# Writers may run off the event loop, so waking goes through call_soon_threadsafe.
+_STATUS_WAITERS: Dict[str, set] = {}
+
+
+def _notify_status_waiters(task_key: str) -> None:
+    for loop, event in list(_STATUS_WAITERS.get(task_key, ())):
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError:
+            # Subscriber's loop already closed; its generator cleans up the entry.
+            pass
 
 
 # Compat shim: allow code that reads TASK_STATUS[key] to work transparently
@@ -156,6 +242,11 @@ class _TaskStatusProxy:
         """Remove a task status entry from both in-memory and GCS."""
         # Remove from in-memory
         result = _LOCAL_TASK_STATUS.pop(key, *args)
+        with _STATUS_STATE_LOCK:
+            _STATUS_UNFLUSHED.pop(key, None)
+            # Fence: uploads still queued for this key must not recreate it
+            if STORAGE_TYPE == "gcs" and GCS_BUCKET_NAME:
+                _STATUS_UPLOADED_SEQ[key] = next(_STATUS_SEQ)
         # Remove from GCS if applicable
         if STORAGE_TYPE == "gcs" and GCS_BUCKET_NAME:
             try:
@@ -186,6 +277,15 @@ if IS_CLOUD_RUN:
 else:
     PAPER_STORAGE_ROOT = os.path.join(PROJECT_ROOT, "paper_storage")
 
+# Environment for the arxiv-translator subprocess, built once at startup
+# (never mutated, so it is passed to every run as-is).
+_TRANSLATOR_ENV = {
+    **os.environ,
+    "PYTHONUNBUFFERED": "1",
+    "ARXIV_TRANSLATOR_LOG_DIR": "/tmp/logs" if IS_CLOUD_RUN else os.path.abspath(os.path.join(BASE_DIR, "logs")),
+    "PYTHONPATH": PROJECT_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""),
+}
+
 # Services Setup (Global Providers)
 STORAGE_TYPE = os.getenv("STORAGE_TYPE", "local").lower() # 'local' or 'gcs'
 GCS_BUCKET_NAME = os.getenv("GCS_BUCKET_NAME")
@@ -254,7 +354,18 @@ class TranslationRequest(BaseModel):
     arxiv_url: str
     model: str = "flash"
 
-def update_status(task_key: str, status: str, message: str = "", progress: int = 0, details: str = ""):
+# ── Status write coalescing ──────────────────────────────────────────────────
+# Per-file TRANSLATING / TOKENS_TOTAL lines can arrive many times per second.
+# Coalesced updates only log + persist if the status changed, progress moved by
+# >= 2 points, or the last flush for this task is older than the interval.
+# A skipped update is still the current status: GCS mode uploads it after the
+# interval if nothing newer was written meanwhile.
+_STATUS_FLUSH_INTERVAL = 0.2  # seconds
+_STATUS_LAST_FLUSH: Dict[str, float] = {}
+
+
+def update_status(task_key: str, status: str, message: str = "", progress: int = 0, details: str = "",
+                  log_level: int = logging.INFO, coalesce: bool = False):
     current = TASK_STATUS.get(task_key, {})
     current_pct = current.get("progress_percent", 0)
 
@@ -268,9 +379,23 @@ def update_status(task_key: str, status: str, message: str = "", progress: int =
         else:
             progress = max(progress, current_pct)
 
-    logger.info(f"[{task_key}] {status}: {message} ({progress}%)")
+    now = time.monotonic()
+    skip_flush = (
+        coalesce
+        and current.get("status") == status
+        and progress - current_pct < 2
+        and now - _STATUS_LAST_FLUSH.get(task_key, 0.0) < _STATUS_FLUSH_INTERVAL
+    )
+
+    if not skip_flush:
+        # High-frequency per-file updates pass log_level=logging.DEBUG;
+        # TASK_STATUS is the user-visible source of truth for those.
+        logger.log(log_level, "[%s] %s: %s (%d%%)", task_key, status, message, progress)
+        _STATUS_LAST_FLUSH[task_key] = now
+    if status in ("completed", "failed"):
+        _STATUS_LAST_FLUSH.pop(task_key, None)
 
-    TASK_STATUS[task_key] = {
+    _write_task_status(task_key, {
         "status": status,
         "message": message,
         "progress_percent": progress,
@@ -281,7 +406,13 @@ def update_status(task_key: str, status: str, message: str = "", progress: int =
         # Preserve token counts across status updates
         "total_in_tokens": current.get("total_in_tokens", 0),
         "total_out_tokens": current.get("total_out_tokens", 0),
-    }
+    }, persist=not skip_flush)
+
+
+def update_file_progress(task_key: str, message: str, progress: int):
+    """Coalesced, DEBUG-logged "processing" update for per-file progress lines."""
+    update_status(task_key, "processing", message, progress,
+                  log_level=logging.DEBUG, coalesce=True)
 
 
 def update_file_status(task_key: str, filename: str, file_status: str,
@@ -301,6 +432,28 @@ def update_file_status(task_key: str, filename: str, file_status: str,
 # Track per-file integrity status for cache decisions
 _FILE_INTEGRITY: dict[str, dict[str, bool]] = {}
 
+async def _iter_lines(stream: asyncio.StreamReader, chunk_size: int = 16384):
+    """
+    Yields newline-terminated lines (without the newline) from a subprocess pipe.
+
+    Reads in chunks and splits with bytes.find, which also handles lines longer
+    than StreamReader.readline's 64 KB limit (e.g. a huge LaTeX error dump).
+    """
+    buf = bytearray()
+    while True:
+        chunk = await stream.read(chunk_size)
+        if not chunk:
+            break
+        buf += chunk
+        start = 0
+        while (end := buf.find(b"\n", start)) != -1:
+            yield bytes(buf[start:end])
+            start = end + 1
+        del buf[:start]
+    if buf:
+        yield bytes(buf)
+
+
 async def run_translation_stream(arxiv_url: str, model: str, arxiv_id: str, user_id: str, storage_service: StorageService, library_manager: LibraryManager):
     """
     Executes the translation pipeline in a background task.
@@ -370,21 +523,12 @@ async def run_translation_stream(arxiv_url: str, model: str, arxiv_id: str, user
             "--model", model
         ]
         
-        env = os.environ.copy()
-        env["PYTHONUNBUFFERED"] = "1"
-        if IS_CLOUD_RUN:
-            env["ARXIV_TRANSLATOR_LOG_DIR"] = "/tmp/logs"
-        else:
-            env["ARXIV_TRANSLATOR_LOG_DIR"] = os.path.abspath(os.path.join(BASE_DIR, "logs")) 
-        project_root = os.path.abspath(os.path.join(BASE_DIR, "..", ".."))
-        env["PYTHONPATH"] = project_root + os.pathsep + env.get("PYTHONPATH", "")
-        
         process = await asyncio.create_subprocess_exec(
             *cmd,
             cwd=work_root,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
-            env=env
+            env=_TRANSLATOR_ENV,
         )
 
         # ── Critical: drain stderr concurrently to prevent pipe-buffer deadlock ──
@@ -394,10 +538,7 @@ async def run_translation_stream(arxiv_url: str, model: str, arxiv_id: str, user
 
         async def drain_stderr():
             assert process.stderr is not None
-            while True:
-                raw = await process.stderr.readline()
-                if not raw:
-                    break
+            async for raw in _iter_lines(process.stderr):
                 line_text = raw.decode("utf-8", errors="replace").rstrip()
                 stderr_lines.append(line_text)
                 # Cap in-memory collection to last 200 lines
@@ -422,11 +563,11 @@ async def run_translation_stream(arxiv_url: str, model: str, arxiv_id: str, user
             "FAILED": (0, "Failed"),
         }
 
-        while True:
-            line_bytes = await process.stdout.readline()
-            if not line_bytes:
-                break
-            line = line_bytes.decode('utf-8').strip()
+        async for line_bytes in _iter_lines(process.stdout):
+            # Only IPC lines are acted on; skip decoding ordinary log output
+            if not line_bytes.lstrip().startswith(b"PROGRESS:"):
+                continue
+            line = line_bytes.decode('utf-8', errors='replace').strip()
             if line.startswith("PROGRESS:"):
                 # Parse: PROGRESS:CODE:rest  (split at most twice)
                 parts = line.split(":", 2)
@@ -489,7 +630,7 @@ async def run_translation_stream(arxiv_url: str, model: str, arxiv_id: str, user
                             f"✅ {fname_t} done | "
                             f"Gemini In: {new_in:,} / Out: {new_out:,} tokens total"
                         )
-                        update_status(task_key, "processing", tok_msg, current_pct)
+                        update_file_progress(task_key, tok_msg, current_pct)
                         logger.info(f"[tokens] {fname_t}: in={in_t} out={out_t} | total in={new_in} out={new_out}")
                     except Exception:
                         pass
@@ -518,11 +659,11 @@ async def run_translation_stream(arxiv_url: str, model: str, arxiv_id: str, user
                             count, total = int(p_parts[0]), int(p_parts[1])
                             msg = p_parts[2]
                             pct = max(15 + int((count / total) * 70), current_pct) if total > 0 else current_pct
-                            update_status(task_key, "processing", f"Translating: {msg}", pct)
+                            update_file_progress(task_key, f"Translating: {msg}", pct)
                         else:
-                            update_status(task_key, "processing", f"Translating: {rest}", current_pct)
+                            update_file_progress(task_key, f"Translating: {rest}", current_pct)
                     except Exception:
-                        update_status(task_key, "processing", f"Translating: {rest}", current_pct)
+                        update_file_progress(task_key, f"Translating: {rest}", current_pct)
 
 
                 # ── Standard status_map codes ──────────────────────────────
@@ -617,6 +758,10 @@ async def run_translation_stream(arxiv_url: str, model: str, arxiv_id: str, user
                     break
 
         if found_pdf_path:
+             # Fetch arXiv metadata (blocking feedparser call) in a worker thread
+             # while the PDF/tex uploads and cache writes below are in flight.
+             meta_task = asyncio.create_task(asyncio.to_thread(fetch_arxiv_metadata, arxiv_id))
+
              pdf_filename = os.path.basename(found_pdf_path)
              await storage_service.upload_file(found_pdf_path, f"{arxiv_id}/{pdf_filename}")
 
@@ -666,7 +811,7 @@ async def run_translation_stream(arxiv_url: str, model: str, arxiv_id: str, user
              file_integrity = _FILE_INTEGRITY.get(task_key, {})
              source_zh_tex_dir = os.path.join(workspace_dir_tex, "source_zh")
              if os.path.isdir(source_zh_tex_dir):
-                 cache_count = 0
+                 to_cache = {}
                  for root_d, _, cache_files in os.walk(source_zh_tex_dir):
                      for fname in cache_files:
                          if fname.endswith(".tex"):
@@ -675,16 +820,12 @@ async def run_translation_stream(arxiv_url: str, model: str, arxiv_id: str, user
                                  local_path = os.path.join(root_d, fname)
                                  try:
                                      with open(local_path, 'r', encoding='utf-8', errors='ignore') as cf:
-                                         translated_content = cf.read()
-                                     await translation_cache.put_cache(
-                                         arxiv_id, fname, translated_content,
-                                         is_valid=True, model=model,
-                                     )
-                                     cache_count += 1
+                                         to_cache[fname] = cf.read()
                                  except Exception as cache_e:
-                                     logger.warning(f"Cache write failed for {fname}: {cache_e}")
+                                     logger.warning(f"Cache read failed for {fname}: {cache_e}")
                              else:
                                  logger.info(f"Skipping cache for {fname} (integrity={is_valid})")
+                 cache_count = len(await translation_cache.put_cache_many(arxiv_id, to_cache, model=model))
                  if cache_count > 0:
                      await translation_cache.mark_complete(arxiv_id)
                      logger.info(f"Cached {cache_count} valid translated files for {arxiv_id}")
@@ -695,7 +836,7 @@ async def run_translation_stream(arxiv_url: str, model: str, arxiv_id: str, user
              current_state = TASK_STATUS.get(task_key, {})
              total_in = current_state.get("total_in_tokens", 0)
              total_out = current_state.get("total_out_tokens", 0)
-             meta = fetch_arxiv_metadata(arxiv_id)
+             meta = await meta_task
              await library_manager.add_paper(
                  arxiv_id, model, 
                  meta.get("title", arxiv_id), 
@@ -839,9 +980,35 @@ async def translate_paper(
     
     return {"message": "Started", "arxiv_id": arxiv_id_base}
 
+# Upper bound on ids per batched /status call
+_STATUS_BATCH_MAX = 100
+
+
+@app.get("/status")
+async def get_status_many(
+    ids: str,
+    user_id: str = Depends(get_current_user)
+):
+    """
+    Batched status lookup: ?ids=a,b,c returns {arxiv_id: status} in one round-trip.
+    Unknown ids map to {"status": "not_found"}.
+    """
+    arxiv_ids = list(dict.fromkeys(i.strip() for i in ids.split(",") if i.strip()))
+    if len(arxiv_ids) > _STATUS_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"at most {_STATUS_BATCH_MAX} ids per request")
+    statuses = await asyncio.gather(*(
+        asyncio.to_thread(_read_task_status, f"{user_id}:{arxiv_id}") for arxiv_id in arxiv_ids
+    ))
+    return {
+        arxiv_id: status or {"status": "not_found"}
+        for arxiv_id, status in zip(arxiv_ids, statuses)
+    }
+
+
 @app.get("/status/{arxiv_id}")
 async def get_status(
     arxiv_id: str, 
+    request: Request,
     user_id: str = Depends(get_current_user)
 ):
     task_key = f"{user_id}:{arxiv_id}"
@@ -849,7 +1016,57 @@ async def get_status(
     status = await asyncio.to_thread(_read_task_status, task_key)
     if not status:
         return {"status": "not_found"}
-    return status
+    # Pollers send the last ETag back; an unchanged status costs an empty 304.
+    body = orjson.dumps(status)
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+# Without a local wake-up (e.g. the task runs on another Cloud Run instance),
+# the stream re-reads the status at this interval and sends a keep-alive.
+_STATUS_EVENTS_KEEPALIVE = 15.0  # seconds
+
+
+@app.get("/status/{arxiv_id}/events")
+async def stream_status(
+    arxiv_id: str,
+    user_id: str = Depends(get_current_user)
+):
+    """Server-sent events: one `data:` line per status change, closed on completed/failed."""
+    task_key = f"{user_id}:{arxiv_id}"
+
+    async def _gen():
+        event = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), event)
+        _STATUS_WAITERS.setdefault(task_key, set()).add(waiter)
+        last = None
+        try:
+            while True:
+                event.clear()
+                status = await asyncio.to_thread(_read_task_status, task_key) or {"status": "not_found"}
+                if status != last:
+                    last = status
+                    yield f"data: {json.dumps(status)}\n\n"
+                    if status.get("status") in ("completed", "failed", "not_found"):
+                        return
+                try:
+                    await asyncio.wait_for(event.wait(), _STATUS_EVENTS_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            waiters = _STATUS_WAITERS.get(task_key)
+            if waiters is not None:
+                waiters.discard(waiter)
+                if not waiters:
+                    _STATUS_WAITERS.pop(task_key, None)
+
+    return StreamingResponse(
+        _gen(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @app.get("/paper/{arxiv_id}/texfile")
 async def get_tex_file(
@@ -933,6 +1150,22 @@ async def _get_or_create_signed_url(blob, gcs_path: str) -> str | None:
     return signed_url
 
 
+# Chunk size for proxying GCS objects through the backend
+_BLOB_STREAM_CHUNK = 1 << 20  # 1 MiB
+
+
+async def _iter_blob(reader):
+    """Yield an open GCS BlobReader in chunks without holding the object in memory."""
+    try:
+        while True:
+            chunk = await asyncio.to_thread(reader.read, _BLOB_STREAM_CHUNK)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        await asyncio.to_thread(reader.close)
+
+
 @app.get("/paper/{arxiv_id}/{file_type}")
 async def get_paper(
     arxiv_id: str, 
@@ -981,14 +1214,21 @@ async def get_paper(
                         # Fallback: stream directly through backend
                         logger.warning(f"Signed URL failed, falling back to proxy: {sign_err}")
                         filename = os.path.basename(candidate)
-                        blob_bytes = await asyncio.to_thread(blob.download_as_bytes)
-                        return Response(
-                            content=blob_bytes,
+                        # Metadata first: gives Content-Length and pins the
+                        # generation the reader streams.
+                        await asyncio.to_thread(blob.reload)
+                        reader = await asyncio.to_thread(
+                            blob.open, "rb", chunk_size=_BLOB_STREAM_CHUNK,
+                            if_generation_match=blob.generation,
+                        )
+                        headers = {
+                            "Content-Disposition": f'inline; filename="{filename}"',
+                            "Content-Length": str(blob.size),
+                        }
+                        return StreamingResponse(
+                            _iter_blob(reader),
                             media_type="application/pdf",
-                            headers={
-                                "Content-Disposition": f'inline; filename="{filename}"',
-                                "Content-Length": str(len(blob_bytes)),
-                            },
+                            headers=headers,
                         )
             except HTTPException:
                 raise
@@ -1224,7 +1464,7 @@ async def admin_delete_paper(
         user_storage = root_storage.get_user_storage(target_user_id)
         lib = LibraryManager(user_storage)
 
-        # Delete from library.json
+        # Delete from the library
         await lib.delete_paper(arxiv_id)
 
         # Delete all files (PDFs, tex files, etc.)
@@ -1248,7 +1488,7 @@ async def admin_delete_user(
 ):
     """
     Admin endpoint: delete ALL data for a given user.
-    Removes: all paper files, library.json, all status caches.
+    Removes: all paper files, the library, all status caches.
     """
     try:
         user_storage = root_storage.get_user_storage(target_user_id)
@@ -1262,14 +1502,9 @@ async def admin_delete_user(
 
         # Delete the entire user folder from storage
         if isinstance(root_storage, GCSStorageService) and GCS_BUCKET_NAME:
-            from google.cloud import storage as gcs_storage
-            client = gcs_storage.Client()
-            bucket = client.bucket(GCS_BUCKET_NAME)
             prefix = f"users/{target_user_id}/"
-            blobs = list(bucket.list_blobs(prefix=prefix))
-            if blobs:
-                bucket.delete_blobs(blobs)
-                logger.info(f"Admin deleted {len(blobs)} GCS blobs under {prefix}")
+            await root_storage.delete_folder(prefix)
+            logger.info(f"Admin deleted GCS blobs under {prefix}")
         else:
             import shutil
             user_dir = os.path.join(PAPER_STORAGE_ROOT, "users", target_user_id)
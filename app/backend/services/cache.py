@@ -8,12 +8,17 @@ translations are cached.
 Storage layout:
   _cache/{arxiv_id_v}/{filename}     — translated .tex content
   _cache/{arxiv_id_v}/meta.json      — metadata + per-file validity flags
+  _cache/{arxiv_id_v}/meta.log       — append-only JSONL of files cached since
+                                       the last compaction (folded into
+                                       meta.json by mark_complete)
 """
 
-import json
+import orjson
+import asyncio
 import hashlib
+from collections import OrderedDict
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Dict, List, Optional
 
 from ..logging_config import setup_logger
 from .storage import StorageService
@@ -32,6 +37,10 @@ class TranslationCache:
                      are deterministic for the same paper version + model.
         """
         self.storage = storage
+        # Parsed metadata keyed by arxiv_id_v -> (storage signature, meta).
+        # Entries are shared between callers and must not be mutated.
+        self._meta_cache: "OrderedDict[str, tuple[tuple, dict]]" = OrderedDict()
+        self._meta_cache_size = 512
 
     def _cache_prefix(self, arxiv_id_v: str) -> str:
         """GCS/local path prefix for a given versioned arxiv ID."""
@@ -42,26 +51,100 @@ class TranslationCache:
     def _meta_path(self, arxiv_id_v: str) -> str:
         return f"{self._cache_prefix(arxiv_id_v)}/meta.json"
 
+    def _log_path(self, arxiv_id_v: str) -> str:
+        return f"{self._cache_prefix(arxiv_id_v)}/meta.log"
+
     def _file_path(self, arxiv_id_v: str, filename: str) -> str:
         return f"{self._cache_prefix(arxiv_id_v)}/{filename}"
 
-    async def _read_meta(self, arxiv_id_v: str) -> dict:
-        """Read cache metadata, returns empty dict if not found."""
+    async def _read_meta(self, arxiv_id_v: str, listing: Optional[Dict[str, tuple]] = None) -> dict:
+        """
+        Read cache metadata (meta.json + pending meta.log entries), returns empty dict if not found.
+
+        Args:
+            listing: Optional stat_prefix() result for the paper's cache prefix,
+                     used instead of stat'ing the metadata files again.
+        """
         meta_path = self._meta_path(arxiv_id_v)
+        log_path = self._log_path(arxiv_id_v)
+        try:
+            if listing is not None:
+                sig = (listing.get(meta_path), listing.get(log_path))
+            else:
+                sig = (await self.storage.stat(meta_path), await self.storage.stat(log_path))
+        except Exception as e:
+            logger.warning(f"Cache meta stat error for {arxiv_id_v}: {e}")
+            sig = None
+
+        if sig is not None:
+            if sig == (None, None):
+                return {}
+            cached = self._meta_cache.get(arxiv_id_v)
+            if cached and cached[0] == sig:
+                self._meta_cache.move_to_end(arxiv_id_v)
+                return cached[1]
+
+        cacheable = sig is not None
+        meta = {}
         try:
-            if await self.storage.exists(meta_path):
+            if sig is None or sig[0] is not None:
                 content = await self.storage.read_file(meta_path)
-                return json.loads(content)
+                meta = orjson.loads(content)
+        except FileNotFoundError:
+            pass
         except Exception as e:
             logger.warning(f"Cache meta read error for {arxiv_id_v}: {e}")
-        return {}
+            cacheable = False
+
+        try:
+            if sig is None or sig[1] is not None:
+                content = await self.storage.read_file(log_path)
+                for line in content.splitlines():
+                    if not line.strip():
+                        continue
+                    entry = orjson.loads(line)
+                    if not meta:
+                        meta = {
+                            "arxiv_id": arxiv_id_v,
+                            "model": entry.get("model", ""),
+                            "created_at": entry["cached_at"],
+                            "files": {},
+                            "complete": False,
+                        }
+                    meta.setdefault("files", {})[entry["filename"]] = {
+                        "valid": entry["valid"],
+                        "hash": entry["hash"],
+                        "cached_at": entry["cached_at"],
+                    }
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Cache meta log read error for {arxiv_id_v}: {e}")
+            cacheable = False
+
+        if cacheable:
+            self._meta_cache[arxiv_id_v] = (sig, meta)
+            self._meta_cache.move_to_end(arxiv_id_v)
+            if len(self._meta_cache) > self._meta_cache_size:
+                self._meta_cache.popitem(last=False)
+        return meta
+
+    async def _append_meta(self, arxiv_id_v: str, entries: List[dict]):
+        """Append per-file entries to the metadata log in one write."""
+        log_path = self._log_path(arxiv_id_v)
+        try:
+            lines = b"".join(orjson.dumps(e, option=orjson.OPT_APPEND_NEWLINE) for e in entries)
+            await self.storage.append_file(log_path, lines.decode())
+        except Exception as e:
+            logger.warning(f"Cache meta log write error for {arxiv_id_v}: {e}")
 
     async def _write_meta(self, arxiv_id_v: str, meta: dict):
         """Write cache metadata."""
         meta_path = self._meta_path(arxiv_id_v)
+        self._meta_cache.pop(arxiv_id_v, None)
         try:
-            content = json.dumps(meta, indent=2, ensure_ascii=False)
-            await self.storage.write_file(meta_path, content)
+            content = orjson.dumps(meta, option=orjson.OPT_INDENT_2)
+            await self.storage.write_bytes(meta_path, content)
         except Exception as e:
             logger.warning(f"Cache meta write error for {arxiv_id_v}: {e}")
 
@@ -82,15 +165,57 @@ class TranslationCache:
 
         file_path = self._file_path(arxiv_id_v, filename)
         try:
-            if await self.storage.exists(file_path):
-                content = await self.storage.read_file(file_path)
-                logger.info(f"Cache HIT: {arxiv_id_v}/{filename}")
-                return content
+            content = await self.storage.read_file(file_path)
+            logger.info(f"Cache HIT: {arxiv_id_v}/{filename}")
+            return content
+        except FileNotFoundError:
+            pass
         except Exception as e:
             logger.warning(f"Cache file read error: {arxiv_id_v}/{filename}: {e}")
 
         return None
 
+    async def get_cached_many(self, arxiv_id_v: str, filenames: List[str]) -> Dict[str, str]:
+        """
+        Retrieve cached translations for several files of one paper.
+
+        One prefix scan yields both the metadata signatures and which files
+        exist; metadata is read at most once and contents are fetched
+        concurrently.
+
+        Returns:
+            Dict of filename -> translated content for cache hits only.
+        """
+        try:
+            listing = await self.storage.stat_prefix(self._cache_prefix(arxiv_id_v) + "/")
+        except Exception as e:
+            logger.warning(f"Cache prefix scan error for {arxiv_id_v}: {e}")
+            return {}
+
+        meta = await self._read_meta(arxiv_id_v, listing)
+        files_meta = meta.get("files", {})
+        paths = {f: self._file_path(arxiv_id_v, f) for f in filenames}
+        hits = [
+            f for f in filenames
+            if files_meta.get(f, {}).get("valid", False) and paths[f] in listing
+        ]
+        if not hits:
+            return {}
+
+        contents = await asyncio.gather(
+            *(self.storage.read_file(paths[f]) for f in hits),
+            return_exceptions=True,
+        )
+        results = {}
+        for filename, content in zip(hits, contents):
+            if isinstance(content, Exception):
+                logger.warning(f"Cache file read error: {arxiv_id_v}/{filename}: {content}")
+                continue
+            results[filename] = content
+        if results:
+            logger.info(f"Cache HIT: {arxiv_id_v} ({len(results)}/{len(filenames)} files)")
+        return results
+
     async def put_cache(
         self,
         arxiv_id_v: str,
@@ -110,33 +235,57 @@ class TranslationCache:
             )
             return
 
-        # Write the translated content
-        file_path = self._file_path(arxiv_id_v, filename)
-        try:
-            await self.storage.write_file(file_path, content)
-        except Exception as e:
-            logger.error(f"Cache write error: {arxiv_id_v}/{filename}: {e}")
-            return
+        await self.put_cache_many(arxiv_id_v, {filename: content}, model=model)
 
-        # Update metadata
-        meta = await self._read_meta(arxiv_id_v)
-        if not meta:
-            meta = {
-                "arxiv_id": arxiv_id_v,
-                "model": model,
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "files": {},
-                "complete": False,
-            }
+    async def put_cache_many(
+        self,
+        arxiv_id_v: str,
+        files: Dict[str, str],
+        model: str = "",
+    ) -> List[str]:
+        """
+        Store several validated translations of one paper.
 
-        meta.setdefault("files", {})[filename] = {
-            "valid": True,
-            "hash": hashlib.sha256(content.encode("utf-8")).hexdigest()[:16],
-            "cached_at": datetime.now(timezone.utc).isoformat(),
-        }
+        File contents are written concurrently and all of their metadata goes
+        into the log with a single append, instead of one append per file.
+
+        Returns:
+            Filenames that were written (failed writes are logged and skipped).
+        """
+        if not files:
+            return []
 
-        await self._write_meta(arxiv_id_v, meta)
-        logger.info(f"Cache PUT: {arxiv_id_v}/{filename} (valid={is_valid})")
+        names = list(files)
+        results = await asyncio.gather(
+            *(self.storage.write_file(self._file_path(arxiv_id_v, f), files[f]) for f in names),
+            return_exceptions=True,
+        )
+        written = []
+        for filename, result in zip(names, results):
+            if isinstance(result, Exception):
+                logger.error(f"Cache write error: {arxiv_id_v}/{filename}: {result}")
+            else:
+                written.append(filename)
+        if not written:
+            return []
+
+        # Record in the metadata log (compacted into meta.json on mark_complete)
+        cached_at = datetime.now(timezone.utc).isoformat()
+        await self._append_meta(arxiv_id_v, [
+            {
+                "filename": filename,
+                "valid": True,
+                "hash": hashlib.blake2b(files[filename].encode("utf-8"), digest_size=8).hexdigest(),
+                "model": model,
+                "cached_at": cached_at,
+            }
+            for filename in written
+        ])
+        if len(written) == 1:
+            logger.info(f"Cache PUT: {arxiv_id_v}/{written[0]} (valid=True)")
+        else:
+            logger.info(f"Cache PUT: {arxiv_id_v} ({len(written)} files)")
+        return written
 
     async def is_complete(self, arxiv_id_v: str) -> bool:
         """Check if all files for this paper have been cached."""
@@ -144,10 +293,22 @@ class TranslationCache:
         return meta.get("complete", False)
 
     async def mark_complete(self, arxiv_id_v: str):
-        """Mark the entire paper translation as complete in cache."""
+        """Mark the entire paper translation as complete and compact the metadata log."""
+        log_path = self._log_path(arxiv_id_v)
+        # Taken before reading, so any put_cache landing after it keeps the log
+        log_sig = await self.storage.stat(log_path)
         meta = await self._read_meta(arxiv_id_v)
         if meta:
-            meta["complete"] = True
-            meta["completed_at"] = datetime.now(timezone.utc).isoformat()
+            meta = {
+                **meta,
+                "complete": True,
+                "completed_at": datetime.now(timezone.utc).isoformat(),
+            }
             await self._write_meta(arxiv_id_v, meta)
+            try:
+                # A log that changed meanwhile stays; it replays over meta.json.
+                if log_sig is not None:
+                    await self.storage.delete_if_unchanged(log_path, log_sig)
+            except Exception as e:
+                logger.warning(f"Cache meta log delete error for {arxiv_id_v}: {e}")
             logger.info(f"Cache COMPLETE: {arxiv_id_v}")
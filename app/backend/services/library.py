@@ -1,53 +1,160 @@
 
-import json
+import orjson
 import asyncio
-from typing import List, Dict, Optional
+from collections import OrderedDict
+from typing import Callable, List, Dict, Optional
 from ..logging_config import setup_logger
 
 logger = setup_logger("LibraryManager")
 from .storage import StorageService
 
+# Parsed library shared across LibraryManager instances (one is created per
+# request): storage uri -> (storage.stat signature, library dict, log length).
+# LRU-bounded; a memoized dict is never mutated, managers work on a copy.
+_LIBRARY_MEMO: "OrderedDict[str, tuple]" = OrderedDict()
+_LIBRARY_MEMO_SIZE = 512
+
+# Fold library.log back into library.json once it holds this many mutations
+LOG_COMPACT_THRESHOLD = 50
+# Optimistic-concurrency attempts per mutation before giving up
+COMMIT_RETRIES = 5
+
 class LibraryManager:
     """
     Manages the user's personal library of papers.
     
     Persistence Strategy:
-    Currently uses a simple `library.json` file stored in the user's storage root.
+    A `library.json` snapshot in the user's storage root plus an append-only
+    `library.log` (JSONL) of mutations since the snapshot. Each add/delete
+    appends one line; the log is folded into the snapshot every
+    LOG_COMPACT_THRESHOLD mutations.
     
     Concurrency Note:
-    This implementation is NOT thread-safe for concurrent writes from multiple processes
-    (though safe enough for single-user async loop if not scaling horizontally).
-    For production scaling, this should be replaced by a proper database (PostgreSQL/Firestore).
+    Mutations are optimistic: a log entry is only appended if library.log is
+    unchanged since it was read (GCS generation precondition / flock + stat
+    locally), otherwise the mutation is rebuilt on a fresh read. For production
+    scaling, this should still be replaced by a proper database (PostgreSQL/Firestore).
     """
     def __init__(self, storage: StorageService):
         self.storage = storage
         self.library_file = "library.json" # Relative to storage root
+        self.log_file = "library.log"
         self._cache: Dict[str, dict] = {} # In-memory cache
+        self._log_len = 0
+        self._sig: Optional[tuple] = None # (library.json, library.log) signature of _cache
         self._loaded = False
 
+    async def _signature(self) -> tuple:
+        return (await self.storage.stat(self.library_file), await self.storage.stat(self.log_file))
+
+    def _remember(self, sig: tuple):
+        self._sig = sig
+        key = self.storage.uri(self.library_file)
+        _LIBRARY_MEMO[key] = (sig, self._cache, self._log_len)
+        _LIBRARY_MEMO.move_to_end(key)
+        if len(_LIBRARY_MEMO) > _LIBRARY_MEMO_SIZE:
+            _LIBRARY_MEMO.popitem(last=False)
+
     async def _load_library(self):
         """Loads library from storage if not already loaded."""
         if self._loaded:
             return
 
         try:
-            if await self.storage.exists(self.library_file):
-                content = await self.storage.read_file(self.library_file)
-                self._cache = json.loads(content)
+            sig = await self._signature()
+            key = self.storage.uri(self.library_file)
+            memo = _LIBRARY_MEMO.get(key)
+            if memo and memo[0] == sig:
+                _LIBRARY_MEMO.move_to_end(key)
+                # Shallow copy: _apply edits the top-level dict in place,
+                # paper dicts themselves are replaced, never edited.
+                self._sig, self._cache, self._log_len = memo[0], dict(memo[1]), memo[2]
             else:
-                self._cache = {}
+                self._cache, self._log_len = {}, 0
+                consistent = True
+                if sig[0] is not None:
+                    try:
+                        content = await self.storage.read_file(self.library_file)
+                        self._cache = orjson.loads(content)
+                    except FileNotFoundError:
+                        consistent = False
+                if sig[1] is not None:
+                    try:
+                        content = await self.storage.read_file(self.log_file)
+                    except FileNotFoundError:
+                        # Compacted since we stat'ed it: the snapshot read above
+                        # may predate that, so don't memoize this view.
+                        content, consistent = "", False
+                    for line in content.splitlines():
+                        if line.strip():
+                            self._apply(orjson.loads(line))
+                            self._log_len += 1
+                if consistent:
+                    self._remember(sig)
+                else:
+                    self._sig = sig
             self._loaded = True
         except Exception as e:
             logger.error(f"Failed to load library: {e}")
             self._cache = {}
 
-    async def _save_library(self):
-        """Saves current cache to storage."""
+    def _apply(self, entry: dict):
+        """Applies one library.log mutation to the in-memory library."""
+        if entry["op"] == "put":
+            self._cache[entry["id"]] = entry["paper"]
+        elif entry["op"] == "delete":
+            self._cache.pop(entry["id"], None)
+
+    async def _commit(self, build: Callable[[], Optional[dict]]) -> Optional[dict]:
+        """
+        Persists one mutation with optimistic concurrency.
+
+        `build` derives a library.log entry from the freshly loaded library
+        (without mutating it), or returns None when there is nothing to do.
+        The entry is appended only if library.log is unchanged since the
+        load; otherwise the library is reloaded and `build` runs again.
+        Returns the committed entry.
+        """
+        key = self.storage.uri(self.library_file)
         try:
-            content = json.dumps(self._cache, indent=2, ensure_ascii=False)
-            await self.storage.write_file(self.library_file, content)
+            for _ in range(COMMIT_RETRIES):
+                self._loaded = False
+                await self._load_library()
+                if not self._loaded:
+                    return None
+                entry = build()
+                if entry is None:
+                    return None
+
+                line = orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE).decode()
+                log_sig = await self.storage.append_if_unchanged(self.log_file, line, self._sig[1])
+                if log_sig is None:
+                    continue  # Lost the race to another writer: reload and rebuild
+
+                self._apply(entry)
+                self._log_len += 1
+                self._remember((self._sig[0], log_sig))
+                if self._log_len % LOG_COMPACT_THRESHOLD == 0:
+                    await self._compact()
+                return entry
+            logger.error(f"Library update gave up after {COMMIT_RETRIES} conflicting writes")
         except Exception as e:
+            _LIBRARY_MEMO.pop(key, None)
             logger.error(f"Failed to save library: {e}")
+        return None
+
+    async def _compact(self):
+        """Folds library.log into the library.json snapshot."""
+        # Hand orjson's bytes straight to storage (no intermediate str copy)
+        content = orjson.dumps(self._cache, option=orjson.OPT_INDENT_2)
+        await self.storage.write_bytes(self.library_file, content)
+        # Only drop the log if nobody appended meanwhile; replaying a log over
+        # a snapshot of its own prefix is harmless, so a kept log is fine.
+        if await self.storage.delete_if_unchanged(self.log_file, self._sig[1]):
+            self._log_len = 0
+            self._remember((await self.storage.stat(self.library_file), None))
+        else:
+            _LIBRARY_MEMO.pop(self.storage.uri(self.library_file), None)
 
     async def add_paper(
         self, arxiv_id: str, model: str, title: str, abstract: str,
@@ -62,37 +169,41 @@ class LibraryManager:
         from datetime import datetime, timezone
         now_iso = datetime.now(timezone.utc).isoformat()
 
-        await self._load_library()
-        
-        if arxiv_id not in self._cache:
-            self._cache[arxiv_id] = {
-                "id": arxiv_id,
-                "title": title,
-                "abstract": abstract,
-                "authors": authors,
-                "categories": categories,
-                "versions": []
-            }
-        
-        # Check if version exists
-        versions = self._cache[arxiv_id]["versions"]
-        existing = next((v for v in versions if v["model"] == model), None)
-        
-        if existing:
-            existing["status"] = "completed"
-            existing["timestamp"] = now_iso
-            existing["total_in_tokens"] = total_in_tokens
-            existing["total_out_tokens"] = total_out_tokens
-        else:
-            versions.append({
-                "model": model,
-                "status": "completed",
-                "timestamp": now_iso,
-                "total_in_tokens": total_in_tokens,
-                "total_out_tokens": total_out_tokens,
-            })
-            
-        await self._save_library()
+        def build() -> dict:
+            # Copy-on-write: _cache may be shared with other managers
+            paper = self._cache.get(arxiv_id)
+            if paper is None:
+                paper = {
+                    "id": arxiv_id,
+                    "title": title,
+                    "abstract": abstract,
+                    "authors": authors,
+                    "categories": categories,
+                    "versions": []
+                }
+            else:
+                paper = {**paper, "versions": [dict(v) for v in paper["versions"]]}
+
+            # Check if version exists
+            versions = paper["versions"]
+            existing = next((v for v in versions if v["model"] == model), None)
+
+            if existing:
+                existing["status"] = "completed"
+                existing["timestamp"] = now_iso
+                existing["total_in_tokens"] = total_in_tokens
+                existing["total_out_tokens"] = total_out_tokens
+            else:
+                versions.append({
+                    "model": model,
+                    "status": "completed",
+                    "timestamp": now_iso,
+                    "total_in_tokens": total_in_tokens,
+                    "total_out_tokens": total_out_tokens,
+                })
+            return {"op": "put", "id": arxiv_id, "paper": paper}
+
+        await self._commit(build)
 
     async def list_papers(self) -> List[dict]:
         await self._load_library()
@@ -105,9 +216,9 @@ class LibraryManager:
         return self._cache.get(arxiv_id)
 
     async def delete_paper(self, arxiv_id: str) -> bool:
-        await self._load_library()
-        if arxiv_id in self._cache:
-            del self._cache[arxiv_id]
-            await self._save_library()
-            return True
-        return False
+        def build() -> Optional[dict]:
+            if arxiv_id not in self._cache:
+                return None
+            return {"op": "delete", "id": arxiv_id}
+
+        return await self._commit(build) is not None
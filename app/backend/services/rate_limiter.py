@@ -6,8 +6,9 @@ Not suitable for multi-instance deployments without external state (Redis).
 For Cloud Run single-instance, this is sufficient.
 """
 
+import threading
 import time
-from collections import defaultdict
+from collections import defaultdict, deque
 from typing import Tuple
 
 from fastapi import HTTPException, Request, Depends
@@ -20,8 +21,17 @@ class RateLimiter:
     def __init__(self, max_requests: int = 5, window_seconds: int = 60):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        # user_id -> list of request timestamps
-        self._requests: dict[str, list[float]] = defaultdict(list)
+        # user_id -> request timestamps, oldest first
+        self._requests: dict[str, deque[float]] = defaultdict(deque)
+        self._last_gc = time.time()
+        # check() runs in the threadpool (sync dependency), so guard the shared state
+        self._lock = threading.Lock()
+
+    def _gc(self, cutoff: float):
+        """Drop users with no requests left in the window."""
+        stale = [uid for uid, dq in self._requests.items() if not dq or dq[-1] <= cutoff]
+        for uid in stale:
+            del self._requests[uid]
 
     def check(self, user_id: str) -> Tuple[bool, int]:
         """
@@ -31,22 +41,28 @@ class RateLimiter:
             (allowed, remaining) — whether the request is allowed and how many
             requests remain in the current window.
         """
+        with self._lock:
+            return self._check_locked(user_id)
+
+    def _check_locked(self, user_id: str) -> Tuple[bool, int]:
         now = time.time()
         cutoff = now - self.window_seconds
 
+        if now - self._last_gc >= self.window_seconds:
+            self._gc(cutoff)
+            self._last_gc = now
+
         # Prune old entries
         timestamps = self._requests[user_id]
-        self._requests[user_id] = [t for t in timestamps if t > cutoff]
-        timestamps = self._requests[user_id]
-
-        remaining = self.max_requests - len(timestamps)
+        while timestamps and timestamps[0] <= cutoff:
+            timestamps.popleft()
 
         if len(timestamps) >= self.max_requests:
             return False, 0
 
         # Record this request
         timestamps.append(now)
-        return True, remaining - 1
+        return True, self.max_requests - len(timestamps)
 
 
 # Global rate limiter instance for translation requests
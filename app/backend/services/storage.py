@@ -1,10 +1,16 @@
 
 import os
+import fcntl
 import shutil
+import tempfile
 import asyncio
+import threading
+import uuid
 from abc import ABC, abstractmethod
-from typing import List
+from functools import lru_cache
+from typing import Dict, List
 from google.cloud import storage
+from google.api_core.exceptions import NotFound, PreconditionFailed
 from ..logging_config import setup_logger
 
 logger = setup_logger("StorageService")
@@ -41,10 +47,55 @@ class StorageService(ABC):
         """Writes text content to a file."""
         pass
     
+    @abstractmethod
+    async def write_bytes(self, path: str, data: bytes):
+        """Writes raw bytes to a file."""
+        pass
+
+    @abstractmethod
+    async def append_file(self, path: str, content: str):
+        """Appends text content to a file, creating it if missing."""
+        pass
+
+    @abstractmethod
+    async def append_if_unchanged(self, path: str, content: str, signature: tuple | None) -> tuple | None:
+        """
+        Appends text content only if the file's stat() signature still equals
+        `signature` (None: the file must not exist yet). Returns the file's
+        new signature, or None on a mismatch so the caller can re-read and retry.
+        """
+        pass
+
+    @abstractmethod
+    async def delete_if_unchanged(self, path: str, signature: tuple) -> bool:
+        """Deletes a file only if its stat() signature still equals `signature`."""
+        pass
+
     @abstractmethod
     async def exists(self, path: str) -> bool:
         pass
 
+    @abstractmethod
+    async def stat(self, path: str) -> tuple | None:
+        """Returns a cheap version signature for a file, or None if it does not exist.
+
+        The signature changes whenever the file content changes.
+        """
+        pass
+
+    @abstractmethod
+    async def stat_prefix(self, prefix: str) -> Dict[str, tuple]:
+        """
+        Lists every file under a prefix with its stat() signature in one scan:
+        {path: signature}. Presence in the result is existence.
+        """
+        pass
+
+    @abstractmethod
+    def uri(self, path: str) -> str:
+        """Returns a globally unique location for a path (used as a cache key)."""
+        pass
+
     async def get_file(self, path: str) -> bytes | None:
         """Read a file and return raw bytes, or None if not found."""
         try:
@@ -53,30 +104,57 @@ class StorageService(ABC):
         except (FileNotFoundError, Exception):
             return None
 
+@lru_cache(maxsize=4096)
+def _resolve_local_path(base_path: str, path: str) -> str:
+    """Absolute path of `path` under `base_path` (memoized: storage ops hit the same few paths)."""
+    # Prevent path traversal
+    full_path = os.path.abspath(os.path.join(base_path, path))
+    if full_path != base_path and not full_path.startswith(base_path + os.sep):
+        raise ValueError(f"Invalid path: {path}")
+    return full_path
+
 class LocalStorageService(StorageService):
     def __init__(self, base_path: str):
         self.base_path = os.path.abspath(base_path)
         os.makedirs(self.base_path, exist_ok=True)
 
     def _get_full_path(self, path: str) -> str:
-        # Prevent path traversal
-        full_path = os.path.abspath(os.path.join(self.base_path, path))
-        if not full_path.startswith(self.base_path):
-            raise ValueError(f"Invalid path: {path}")
-        return full_path
+        return _resolve_local_path(self.base_path, path)
+
+    def uri(self, path: str) -> str:
+        return f"file://{self._get_full_path(path)}"
 
     def list_files(self, prefix: str = "") -> List[str]:
+        # Return relative paths (entries all start with base_path + sep)
+        base_len = len(self.base_path) + 1
+        return [entry.path[base_len:] for entry in self._scan(prefix)]
+
+    def _scan(self, prefix: str):
+        """Yields a DirEntry for every file under prefix."""
         target_dir = self._get_full_path(prefix)
-        if not os.path.exists(target_dir):
-            return []
-        # Return relative paths
-        files = []
-        for root, _, filenames in os.walk(target_dir):
-            for filename in filenames:
-                full_path = os.path.join(root, filename)
-                rel_path = os.path.relpath(full_path, self.base_path)
-                files.append(rel_path)
-        return files
+        if not os.path.isdir(target_dir):
+            return
+
+        def walk(path):
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        yield from walk(entry.path)
+                    elif not entry.is_dir():  # like os.walk, skip symlinked dirs
+                        yield entry
+
+        yield from walk(target_dir)
+
+    async def stat_prefix(self, prefix: str) -> Dict[str, tuple]:
+        def scan():
+            base_len = len(self.base_path) + 1
+            results = {}
+            for entry in self._scan(prefix):
+                st = entry.stat()
+                results[entry.path[base_len:]] = self._signature(st)
+            return results
+
+        return await asyncio.to_thread(scan)
 
     async def upload_file(self, local_path: str, destination_path: str):
         dest_full = self._get_full_path(destination_path)
@@ -100,51 +178,225 @@ class LocalStorageService(StorageService):
 
     async def read_file(self, path: str) -> str:
         full = self._get_full_path(path)
-        if not os.path.exists(full):
-            raise FileNotFoundError(f"File not found: {path}")
-        async with asyncio.Lock(): # Simple file lock not strictly needed for read but good practice
+
+        def read():
             with open(full, 'r', encoding='utf-8') as f:
-                return await asyncio.to_thread(f.read)
+                return f.read()
+
+        try:
+            return await asyncio.to_thread(read)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"File not found: {path}")
+
+    @staticmethod
+    def _signature(st: os.stat_result) -> tuple:
+        # The inode catches same-size rewrites within one mtime tick:
+        # _atomic_write swaps in a new file, so every write changes it.
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    @staticmethod
+    def _atomic_write(full: str, data: bytes):
+        """Writes via a temp file + os.replace so readers never see a partial file."""
+        directory = os.path.dirname(full)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(full)}.", suffix=".tmp")
+        try:
+            os.fchmod(fd, 0o644)  # mkstemp creates 0600
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, full)
+        except BaseException:
+            os.unlink(tmp)
+            raise
 
     async def write_file(self, path: str, content: str):
         full = self._get_full_path(path)
-        os.makedirs(os.path.dirname(full), exist_ok=True)
-        async with asyncio.Lock():
-            with open(full, 'w', encoding='utf-8') as f:
-                await asyncio.to_thread(f.write, content)
+        await asyncio.to_thread(self._atomic_write, full, content.encode('utf-8'))
+
+    async def write_bytes(self, path: str, data: bytes):
+        full = self._get_full_path(path)
+        await asyncio.to_thread(self._atomic_write, full, data)
+
+    # Appends and conditional deletes of the same file serialize on flock().
+    # An appender that wakes up holding an unlinked file reopens it.
+
+    async def append_file(self, path: str, content: str):
+        full = self._get_full_path(path)
+
+        def append():
+            os.makedirs(os.path.dirname(full), exist_ok=True)
+            while True:
+                with open(full, 'a', encoding='utf-8') as f:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                    if os.fstat(f.fileno()).st_nlink == 0:
+                        continue
+                    f.write(content)
+                    return
+
+        await asyncio.to_thread(append)
+
+    async def append_if_unchanged(self, path: str, content: str, signature: tuple | None) -> tuple | None:
+        full = self._get_full_path(path)
+
+        def append():
+            os.makedirs(os.path.dirname(full), exist_ok=True)
+            flags = os.O_WRONLY | os.O_APPEND
+            try:
+                if signature is None:
+                    fd = os.open(full, flags | os.O_CREAT | os.O_EXCL)
+                else:
+                    fd = os.open(full, flags)
+            except (FileExistsError, FileNotFoundError):
+                return None
+            with open(fd, 'a', encoding='utf-8') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                st = os.fstat(fd)
+                if st.st_nlink == 0:
+                    return None
+                if signature is not None and self._signature(st) != signature:
+                    return None
+                f.write(content)
+                f.flush()
+                st = os.fstat(fd)
+                return self._signature(st)
+
+        return await asyncio.to_thread(append)
+
+    async def delete_if_unchanged(self, path: str, signature: tuple) -> bool:
+        full = self._get_full_path(path)
+
+        def delete():
+            try:
+                f = open(full, 'rb')
+            except FileNotFoundError:
+                return False
+            with f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                st = os.fstat(f.fileno())
+                if st.st_nlink == 0 or self._signature(st) != signature:
+                    return False
+                os.remove(full)
+                return True
+
+        return await asyncio.to_thread(delete)
 
     async def exists(self, path: str) -> bool:
         full = self._get_full_path(path)
         return os.path.exists(full)
 
+    async def stat(self, path: str) -> tuple | None:
+        full = self._get_full_path(path)
+        try:
+            st = os.stat(full)
+        except FileNotFoundError:
+            return None
+        return self._signature(st)
+
+# One GCS client per process: construction does auth discovery and opens an
+# HTTP session, so user-scoped services share it instead of building their own.
+_CLIENT_LOCK = threading.Lock()
+_SHARED_CLIENT = None
+
+# An open batch captures every request made on its client, including ones
+# from other threads, so batches get a dedicated client used under a lock.
+_BATCH_LOCK = threading.Lock()
+_BATCH_CLIENT = None
+
+# GCS limit on the number of components in a composite object
+_MAX_COMPOSE_COMPONENTS = 1024
+
+# Temporary append chunks live at the bucket root, outside every user and
+# cache prefix, so listings never see them even if a delete fails.
+_APPEND_PART_PREFIX = "_tmp/append-parts/"
+
+
+def _shared_client() -> storage.Client:
+    global _SHARED_CLIENT
+    with _CLIENT_LOCK:
+        if _SHARED_CLIENT is None:
+            _SHARED_CLIENT = storage.Client()
+        return _SHARED_CLIENT
+
+
 class GCSStorageService(StorageService):
     def __init__(self, bucket_name: str, root_prefix: str = ""):
         self.bucket_name = bucket_name
         self.root_prefix = root_prefix # e.g. "users/123/" or empty
+        self._prefix = root_prefix.rstrip('/') + '/' if root_prefix else ''
         try:
-            self.client = storage.Client()
+            self.client = _shared_client()
             self.bucket = self.client.bucket(bucket_name)
         except Exception as e:
             logger.error(f"GCS Init Error: {e}")
             raise
 
+    @classmethod
+    def _from_client(cls, client: storage.Client, bucket: storage.Bucket, root_prefix: str) -> 'GCSStorageService':
+        """Builds a service on an existing client/bucket (skips __init__)."""
+        service = cls.__new__(cls)
+        service.bucket_name = bucket.name
+        service.root_prefix = root_prefix
+        service._prefix = root_prefix.rstrip('/') + '/' if root_prefix else ''
+        service.client = client
+        service.bucket = bucket
+        return service
+
+    def _run_batched(self, names: List[str], op) -> list:
+        """
+        Calls op(blob) for each full object name through the JSON API batch
+        endpoint, one HTTP request per 100 calls (GCS batch limit). Per-call
+        errors are not raised. Blocking; returns the blobs in input order.
+        """
+        global _BATCH_CLIENT
+        with _BATCH_LOCK:
+            if _BATCH_CLIENT is None:
+                _BATCH_CLIENT = storage.Client()
+            bucket = _BATCH_CLIENT.bucket(self.bucket_name)
+            blobs = [bucket.blob(name) for name in names]
+            for i in range(0, len(blobs), 100):
+                with _BATCH_CLIENT.batch(raise_exception=False):
+                    for blob in blobs[i:i + 100]:
+                        op(blob)
+            return blobs
+
     def _get_gcs_path(self, path: str) -> str:
         # Join root_prefix and path
-        if self.root_prefix:
-            return f"{self.root_prefix.rstrip('/')}/{path.lstrip('/')}"
+        if self._prefix:
+            return self._prefix + path.lstrip('/')
         return path
 
+    def uri(self, path: str) -> str:
+        return f"gs://{self.bucket_name}/{self._get_gcs_path(path)}"
+
     def list_files(self, prefix: str = "") -> List[str]:
         full_prefix = self._get_gcs_path(prefix)
         blobs = self.client.list_blobs(self.bucket_name, prefix=full_prefix)
         results = []
         for blob in blobs:
             name = blob.name
+            if name.startswith(_APPEND_PART_PREFIX):
+                continue
             if self.root_prefix and name.startswith(self.root_prefix):
                 name = name[len(self.root_prefix):].lstrip('/')
             results.append(name)
         return results
 
+    async def stat_prefix(self, prefix: str) -> Dict[str, tuple]:
+        full_prefix = self._get_gcs_path(prefix)
+
+        def scan():
+            results = {}
+            for blob in self.client.list_blobs(self.bucket_name, prefix=full_prefix):
+                name = blob.name
+                if name.startswith(_APPEND_PART_PREFIX):
+                    continue
+                if self._prefix and name.startswith(self._prefix):
+                    name = name[len(self._prefix):]
+                results[name] = self._signature(blob)
+            return results
+
+        return await asyncio.to_thread(scan)
+
     async def upload_file(self, local_path: str, destination_path: str):
         full_dest = self._get_gcs_path(destination_path)
         blob = self.bucket.blob(full_dest)
@@ -153,54 +405,141 @@ class GCSStorageService(StorageService):
     async def delete_file(self, path: str):
         full_path = self._get_gcs_path(path)
         blob = self.bucket.blob(full_path)
-        if blob.exists():
+        try:
             await asyncio.to_thread(blob.delete)
+        except NotFound:
+            pass
 
     async def delete_folder(self, folder_path: str):
         full_prefix = self._get_gcs_path(folder_path)
         if not full_prefix.endswith('/'):
             full_prefix += '/'
             
-        blobs = list(self.client.list_blobs(self.bucket_name, prefix=full_prefix))
-        
-        def delete_blobs_batch():
-            # GCS Batch delete is efficient
-            # But client.delete_blobs(blobs) exists?
-            # Yes, bucket.delete_blobs(blobs)
-            if blobs:
-                self.bucket.delete_blobs(blobs)
+        def delete_all():
+            names = [b.name for b in self.client.list_blobs(self.bucket_name, prefix=full_prefix)]
+            # Blobs already gone (404) are not an error here
+            self._run_batched(names, lambda blob: blob.delete())
 
-        await asyncio.to_thread(delete_blobs_batch)
+        await asyncio.to_thread(delete_all)
 
     def get_user_storage(self, user_id: str) -> 'StorageService':
         # Return a new GCS service with a prefixed root
         new_prefix = f"users/{user_id}/"
         if self.root_prefix:
             new_prefix = f"{self.root_prefix.rstrip('/')}/users/{user_id}/"
-        return GCSStorageService(self.bucket_name, root_prefix=new_prefix)
+        return GCSStorageService._from_client(self.client, self.bucket, new_prefix)
 
     async def read_file(self, path: str) -> str:
         full_path = self._get_gcs_path(path)
         blob = self.bucket.blob(full_path)
-        if not blob.exists():
-             raise FileNotFoundError(f"File not found: {path}")
-        return await asyncio.to_thread(blob.download_as_text)
+        try:
+            return await asyncio.to_thread(blob.download_as_text)
+        except NotFound:
+            raise FileNotFoundError(f"File not found: {path}")
 
     async def write_file(self, path: str, content: str):
         full_path = self._get_gcs_path(path)
         blob = self.bucket.blob(full_path)
         await asyncio.to_thread(blob.upload_from_string, content)
 
+    async def write_bytes(self, path: str, data: bytes):
+        full_path = self._get_gcs_path(path)
+        blob = self.bucket.blob(full_path)
+        await asyncio.to_thread(blob.upload_from_string, data)
+
+    @staticmethod
+    def _signature(blob) -> tuple:
+        return (blob.generation, blob.size, blob.component_count)
+
+    def _append_at(self, full_path: str, content: str, signature: tuple | None) -> tuple:
+        """
+        Appends content if the object still has `signature` (None: must not
+        exist) and returns its new stat() signature. Raises PreconditionFailed
+        otherwise. Blocking.
+        """
+        blob = self.bucket.blob(full_path)
+        if signature is None:
+            blob.upload_from_string(content, if_generation_match=0)
+            return self._signature(blob)
+        generation, _, components = signature
+        if (components or 1) >= _MAX_COMPOSE_COMPONENTS - 1:
+            # Composite objects are capped at 1024 components: rewrite as a
+            # single-component object, which resets the count.
+            data = blob.download_as_bytes(if_generation_match=generation)
+            blob.upload_from_string(data + content.encode('utf-8'), if_generation_match=generation)
+            return self._signature(blob)
+        # GCS objects are immutable: upload the new chunk as its own object
+        # and compose it onto the end of the existing one (server-side, no
+        # download of the existing content).
+        part = self.bucket.blob(f"{_APPEND_PART_PREFIX}{uuid.uuid4().hex}")
+        try:
+            part.upload_from_string(content)
+            blob.compose([blob, part], if_generation_match=generation)
+        finally:
+            try:
+                part.delete()
+            except NotFound:
+                pass
+            except Exception as e:
+                # The append itself succeeded (or already failed); a stray
+                # part under _APPEND_PART_PREFIX is harmless.
+                logger.warning(f"Could not delete append part {part.name}: {e}")
+        return self._signature(blob)
+
+    async def append_file(self, path: str, content: str):
+        full_path = self._get_gcs_path(path)
+        blob = self.bucket.blob(full_path)
+
+        def append():
+            while True:
+                try:
+                    blob.reload()
+                    signature = self._signature(blob)
+                except NotFound:
+                    signature = None
+                try:
+                    self._append_at(full_path, content, signature)
+                    return
+                except PreconditionFailed:
+                    continue
+
+        await asyncio.to_thread(append)
+
+    async def append_if_unchanged(self, path: str, content: str, signature: tuple | None) -> tuple | None:
+        full_path = self._get_gcs_path(path)
+        try:
+            return await asyncio.to_thread(self._append_at, full_path, content, signature)
+        except PreconditionFailed:
+            return None
+
+    async def delete_if_unchanged(self, path: str, signature: tuple) -> bool:
+        full_path = self._get_gcs_path(path)
+        blob = self.bucket.blob(full_path)
+        try:
+            await asyncio.to_thread(blob.delete, if_generation_match=signature[0])
+        except (NotFound, PreconditionFailed):
+            return False
+        return True
+
     async def exists(self, path: str) -> bool:
         full_path = self._get_gcs_path(path)
         blob = self.bucket.blob(full_path)
         return await asyncio.to_thread(blob.exists)
 
+    async def stat(self, path: str) -> tuple | None:
+        full_path = self._get_gcs_path(path)
+        blob = self.bucket.blob(full_path)
+        try:
+            await asyncio.to_thread(blob.reload)
+        except NotFound:
+            return None
+        return self._signature(blob)
+
     async def get_file(self, path: str) -> bytes | None:
         """Download a file as raw bytes from GCS, or return None if not found."""
         full_path = self._get_gcs_path(path)
         blob = self.bucket.blob(full_path)
-        exists = await asyncio.to_thread(blob.exists)
-        if not exists:
+        try:
+            return await asyncio.to_thread(blob.download_as_bytes)
+        except NotFound:
             return None
-        return await asyncio.to_thread(blob.download_as_bytes)
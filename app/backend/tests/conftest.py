@@ -0,0 +1,23 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.backend import main
+from app.backend.main import app
+
+
+@pytest.fixture(scope="session")
+def client():
+    """One TestClient (and app lifespan) shared by the whole backend suite."""
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(autouse=True)
+def _isolate_app_state():
+    """Give each test an empty task-status store and no dependency overrides."""
+    saved_status = dict(main._LOCAL_TASK_STATUS)
+    saved_overrides = dict(app.dependency_overrides)
+    main._LOCAL_TASK_STATUS.clear()
+    yield
+    main._LOCAL_TASK_STATUS.clear()
+    main._LOCAL_TASK_STATUS.update(saved_status)
+    app.dependency_overrides = saved_overrides
@@ -1,16 +1,13 @@
-from fastapi.testclient import TestClient
+import pytest
 from unittest.mock import patch, MagicMock
-from app.backend.main import app
 
-client = TestClient(app)
-
-def test_read_root():
+def test_read_root(client):
     response = client.get("/")
     assert response.status_code == 200
     assert response.json() == {"message": "ReadPaper Backend is running"}
 
 @patch("app.backend.main.run_translation_task")
-def test_translate_endpoint(mock_task):
+def test_translate_endpoint(mock_task, client):
     # Mock the background task
     mock_task.return_value = None
     
@@ -22,3 +19,246 @@ def test_translate_endpoint(mock_task):
     
     # Verify task called
     mock_task.assert_called_once()
+
+def test_cors_preflight_allowed_origin(client):
+    from app.backend.main import FRONTEND_ORIGINS
+    origin = FRONTEND_ORIGINS[0]
+    response = client.options(
+        "/status/1234.5678",
+        headers={"Origin": origin, "Access-Control-Request-Method": "GET"},
+    )
+    assert response.status_code == 200
+    assert response.headers["access-control-allow-origin"] == origin
+    assert response.headers["access-control-max-age"] == "86400"
+
+def test_cors_preflight_disallowed_origin(client):
+    response = client.options(
+        "/status/1234.5678",
+        headers={"Origin": "https://evil.example.com", "Access-Control-Request-Method": "GET"},
+    )
+    assert "access-control-allow-origin" not in response.headers
+
+def test_update_status_log_levels(caplog):
+    import logging
+    from app.backend.main import update_status, TASK_STATUS
+
+    with caplog.at_level(logging.INFO, logger="main_api"):
+        update_status("log-test", "processing", "Translating: a.tex", 20, log_level=logging.DEBUG)
+        assert not [r for r in caplog.records if r.levelno >= logging.INFO]
+
+        update_status("log-test", "processing", "Failed to download original PDF (Retrying...)", 20)
+        update_status("log-test", "completed", "Processing complete.", 100)
+        update_status("log-test", "failed", "boom")
+
+    messages = [r.getMessage() for r in caplog.records if r.levelno == logging.INFO]
+    assert any("Retrying" in m for m in messages)
+    assert any("completed" in m for m in messages)
+    assert any("failed: boom" in m for m in messages)
+    TASK_STATUS.pop("log-test", None)
+
+def test_update_file_progress_coalesces_logs(caplog):
+    import logging
+    from app.backend.main import update_status, update_file_progress, TASK_STATUS
+
+    update_status("coalesce-test", "processing", "Translating...", 15)
+    with caplog.at_level(logging.DEBUG, logger="main_api"):
+        update_file_progress("coalesce-test", "Translating: a.tex", 15)
+        update_file_progress("coalesce-test", "Translating: b.tex", 16)
+        update_status("coalesce-test", "completed", "Processing complete.", 100)
+
+    messages = [r.getMessage() for r in caplog.records]
+    assert not any("b.tex" in m for m in messages)
+    assert any("completed" in m for m in messages)
+    assert TASK_STATUS["coalesce-test"]["status"] == "completed"
+    TASK_STATUS.pop("coalesce-test", None)
+
+def test_iter_lines_splits_chunks():
+    import asyncio
+    from app.backend.main import _iter_lines
+
+    async def collect():
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"PROGRESS:DOWNLOADING:x\n" + b"a" * 100_000 + b"\nPROGRESS:COMPLETED:Done")
+        reader.feed_eof()
+        return [line async for line in _iter_lines(reader, chunk_size=7)]
+
+    loop = asyncio.new_event_loop()
+    try:
+        lines = loop.run_until_complete(collect())
+    finally:
+        loop.close()
+    assert lines == [b"PROGRESS:DOWNLOADING:x", b"a" * 100_000, b"PROGRESS:COMPLETED:Done"]
+
+def test_status_events_stream_until_completed(client):
+    import json
+    import threading
+    from app.backend.main import app, update_status
+    from app.backend.services.auth import get_current_user
+
+    app.dependency_overrides[get_current_user] = lambda: "sse-user"
+    update_status("sse-user:2401.00001", "processing", "Translating...", 40)
+
+    def finish():
+        update_status("sse-user:2401.00001", "processing", "Compiling PDF...", 90)
+        update_status("sse-user:2401.00001", "completed", "Processing complete.", 100)
+
+    # TestClient buffers the whole body, so the updates must land while the
+    # request is already in flight.
+    timer = threading.Timer(0.3, finish)
+    timer.start()
+    with client.stream("GET", "/status/2401.00001/events") as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [json.loads(line[5:]) for line in response.iter_lines() if line.startswith("data:")]
+    timer.join()
+
+    assert events[0]["progress_percent"] == 40
+    assert events[-1]["status"] == "completed"
+
+def test_status_batch_lookup(client):
+    from app.backend.main import app, update_status
+    from app.backend.services.auth import get_current_user
+
+    app.dependency_overrides[get_current_user] = lambda: "batch-user"
+    update_status("batch-user:2401.00001", "processing", "Translating...", 40)
+    update_status("batch-user:2401.00002", "completed", "Processing complete.", 100)
+    update_status("other-user:2401.00003", "processing", "Translating...", 10)
+
+    response = client.get("/status", params={"ids": "2401.00001,2401.00002,2401.00003"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["2401.00001"]["progress_percent"] == 40
+    assert data["2401.00002"]["status"] == "completed"
+    assert data["2401.00003"] == {"status": "not_found"}
+
+    too_many = ",".join(str(i) for i in range(101))
+    assert client.get("/status", params={"ids": too_many}).status_code == 400
+
+def test_status_etag_not_modified(client):
+    from app.backend.main import app, update_status
+    from app.backend.services.auth import get_current_user
+
+    app.dependency_overrides[get_current_user] = lambda: "etag-user"
+    update_status("etag-user:2401.00001", "processing", "Translating...", 40)
+
+    first = client.get("/status/2401.00001")
+    assert first.status_code == 200
+    assert first.json()["progress_percent"] == 40
+    etag = first.headers["etag"]
+
+    unchanged = client.get("/status/2401.00001", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+
+    update_status("etag-user:2401.00001", "processing", "Compiling PDF...", 90)
+    changed = client.get("/status/2401.00001", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["progress_percent"] == 90
+    assert changed.headers["etag"] != etag
+
+class _DeferredGCS:
+    """GCS status store stand-in whose uploads only run when flush() is called."""
+
+    def __init__(self):
+        self.objects = {}
+        self.queued = []
+
+    # storage.Client / bucket / blob
+    def bucket(self, name):
+        return self
+
+    def blob(self, path):
+        store = self
+
+        class _Blob:
+            def upload_from_string(self, data, content_type=None):
+                store.objects[path] = data
+
+            def download_as_text(self):
+                from google.api_core.exceptions import NotFound
+                if path not in store.objects:
+                    raise NotFound(path)
+                return store.objects[path]
+
+        return _Blob()
+
+    # ThreadPoolExecutor
+    def submit(self, fn, *args):
+        self.queued.append((fn, args))
+
+    def flush(self, reverse=False):
+        queued, self.queued = self.queued, []
+        for fn, args in reversed(queued) if reverse else queued:
+            fn(*args)
+
+
+@pytest.fixture
+def deferred_gcs(monkeypatch):
+    from app.backend import main
+
+    gcs = _DeferredGCS()
+    monkeypatch.setattr(main, "STORAGE_TYPE", "gcs")
+    monkeypatch.setattr(main, "GCS_BUCKET_NAME", "status-bucket")
+    monkeypatch.setattr(main, "_get_gcs_client", lambda: gcs)
+    monkeypatch.setattr(main, "_get_executor", lambda: gcs)
+    monkeypatch.setattr("google.cloud.storage.Client", lambda *a, **kw: gcs)
+    monkeypatch.setattr(main, "_STATUS_UNFLUSHED", {})
+    monkeypatch.setattr(main, "_STATUS_UPLOADED_SEQ", {})
+    return gcs
+
+def test_status_events_not_delayed_by_gcs_upload(client, deferred_gcs):
+    import json
+    import threading
+    import time
+    from app.backend.main import app, update_status
+    from app.backend.services.auth import get_current_user
+
+    app.dependency_overrides[get_current_user] = lambda: "gcs-user"
+    update_status("gcs-user:2401.00001", "processing", "Translating...", 40)
+
+    def finish():
+        update_status("gcs-user:2401.00001", "processing", "Compiling PDF...", 90)
+        update_status("gcs-user:2401.00001", "completed", "Processing complete.", 100)
+
+    timer = threading.Timer(0.3, finish)
+    timer.start()
+    start = time.monotonic()
+    with client.stream("GET", "/status/2401.00001/events") as response:
+        events = [json.loads(line[5:]) for line in response.iter_lines() if line.startswith("data:")]
+    timer.join()
+
+    # Every event arrived although no upload has run yet (no keep-alive wait)
+    assert time.monotonic() - start < 5
+    assert events[0]["progress_percent"] == 40
+    assert events[-1]["status"] == "completed"
+    assert deferred_gcs.objects == {}
+
+    # Uploads finishing out of order still leave the newest status in GCS
+    deferred_gcs.flush(reverse=True)
+    stored = json.loads(deferred_gcs.objects["_status/gcs-user__2401.00001.json"])
+    assert stored["status"] == "completed"
+
+def test_coalesced_update_flushed_after_silence(deferred_gcs, monkeypatch):
+    import json
+    import time
+    from app.backend import main
+    from app.backend.main import update_status, update_file_progress
+
+    monkeypatch.setattr(main, "_STATUS_FLUSH_INTERVAL", 0.05)
+    monkeypatch.setattr(main, "_STATUS_FLUSH_TIMERS", {})
+    key = "gcs-user:2401.00002"
+
+    update_status(key, "processing", "Translating...", 15)
+    update_file_progress(key, "Translating: b.tex", 16)   # coalesced, not uploaded
+    assert len(deferred_gcs.queued) == 1
+    # Served locally right away
+    assert main._read_task_status(key)["message"] == "Translating: b.tex"
+
+    # ... and uploaded once the flush interval passes with no further update
+    deadline = time.monotonic() + 5
+    while len(deferred_gcs.queued) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    deferred_gcs.flush()
+    stored = json.loads(deferred_gcs.objects["_status/gcs-user__2401.00002.json"])
+    assert stored["message"] == "Translating: b.tex"
+    assert stored["progress_percent"] == 16
+    assert key not in main._STATUS_UNFLUSHED
@@ -1,11 +1,9 @@
-from fastapi.testclient import TestClient
+import os
 from unittest.mock import patch, MagicMock
-from app.backend.main import app, TASK_STATUS
-import time
+from app.backend.main import TASK_STATUS
+import threading
 import pytest
 
-client = TestClient(app)
-
 # Mocked output stream from arxiv-translator CLI
 MOCK_CLI_OUTPUT = [
     "PROGRESS:DOWNLOADING:Downloading source...\n",
@@ -19,31 +17,79 @@ MOCK_CLI_OUTPUT = [
 ]
 
 @pytest.fixture
-def mock_subprocess():
-    with patch("subprocess.Popen") as mock_popen, \
-         patch("subprocess.run") as mock_run:
-        
-        # Popen mock for arxiv-translator
-        process_mock = MagicMock()
-        process_mock.stdout.readline.side_effect = MOCK_CLI_OUTPUT + [""]
-        process_mock.poll.return_value = 0
-        process_mock.returncode = 0
-        # process_mock.communicate.return_value = ("", "") # Not needed if we patch run
-        mock_popen.return_value = process_mock
-        
+def mock_subprocess(monkeypatch):
+    """
+    Stands in for the translator subprocess (asyncio.create_subprocess_exec):
+    replays MOCK_CLI_OUTPUT on stdout and leaves a translated PDF in its cwd.
+    The curl download (subprocess.run) is mocked too.
+    """
+    import asyncio
+
+    calls = []
+
+    async def create_subprocess_exec(*cmd, cwd=None, **kwargs):
+        calls.append(cmd)
+        arxiv_id = cmd[3].rsplit("/", 1)[-1]
+        workspace = os.path.join(cwd, f"workspace_{arxiv_id}")
+        os.makedirs(workspace, exist_ok=True)
+        with open(os.path.join(workspace, "paper_zh.pdf"), "wb") as f:
+            f.write(b"%PDF-1.5")
+
+        process = MagicMock()
+        process.stdout = asyncio.StreamReader()
+        process.stdout.feed_data("".join(MOCK_CLI_OUTPUT).encode())
+        process.stdout.feed_eof()
+        process.stderr = asyncio.StreamReader()
+        process.stderr.feed_eof()
+
+        async def wait():
+            return 0
+
+        process.wait = wait
+        return process
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", create_subprocess_exec)
+    with patch("subprocess.run") as mock_run:
         # Run mock for curl
         run_mock = MagicMock()
         run_mock.returncode = 0
         run_mock.stdout = ""
         run_mock.stderr = ""
         mock_run.return_value = run_mock
-        
-        yield mock_popen
 
-def test_backend_polling_flow(mock_subprocess):
-    # Clear previous status
-    TASK_STATUS.clear()
-    
+        yield calls
+
+@pytest.fixture
+def isolated_backend(tmp_path, monkeypatch):
+    """Signed-in user, storage/work dirs under tmp_path and no arXiv metadata fetch."""
+    import app.backend.main as main
+    from app.backend.services.auth import get_current_user
+    from app.backend.services.storage import LocalStorageService
+
+    monkeypatch.setattr(main, "PAPER_STORAGE_ROOT", str(tmp_path))
+    monkeypatch.setattr(main, "fetch_arxiv_metadata", lambda arxiv_id: {})
+    main.app.dependency_overrides[get_current_user] = lambda: "polling-user"
+    main.app.dependency_overrides[main.get_storage_service] = lambda: LocalStorageService(str(tmp_path / "user"))
+    # Status store starts empty (conftest restores it afterwards)
+    main._LOCAL_TASK_STATUS.clear()
+
+@pytest.fixture
+def completed_event(monkeypatch):
+    """Set once the background task reports status 'completed'."""
+    import app.backend.main as main
+
+    event = threading.Event()
+    original = main.update_status
+
+    def update_status(task_key, status, *args, **kwargs):
+        original(task_key, status, *args, **kwargs)
+        if status == "completed":
+            event.set()
+
+    monkeypatch.setattr(main, "update_status", update_status)
+    return event
+
+def test_backend_polling_flow(isolated_backend, mock_subprocess, completed_event, client):
     # 1. Start Translation
     response = client.post("/translate", json={"arxiv_url": "https://arxiv.org/abs/1234.5678"})
     assert response.status_code == 200
@@ -53,32 +99,19 @@ def test_backend_polling_flow(mock_subprocess):
     assert "status" not in data # The real API doesn't return status here
     assert "message" in data
 
-    # 2. Poll Status - Downloading
-    # We need to give the background thread a tiny bit of time to consume the mock, 
-    # but since TestClient runs synchronously in this context, the background task usually runs after response.
-    # However, `TestClient` with `BackgroundTasks` might need `with client:` block or explicit handling?
-    # Actually, starlette TestClient runs background tasks after response.
-    # To test intermediate states, we might need to slow down the mock or run the generator in a way we can check.
-    # But `run_translation_stream` is `async` and runs in `BackgroundTasks`.
-    # Let's rely on the fact that `TASK_STATUS` is a global dict.
-    
-    # Wait for task to process
-    # Since mock outputs are consumed in a loop, it will happen very fast.
-    # We might miss intermediate states if we don't control the speed.
-    # But we can verify the FINAL state is completed.
-    
-    # To verifying polling, we verify that status is updated to 'completed' and contains progress details.
-    
-    # Give it a second (in reality it's instant with mock)
-    time.sleep(0.1)
-    
+    # 2. Wait for the background task to drain the mocked CLI stream.
+    # Intermediate states go by too fast to observe, so only the final
+    # 'completed' state is checked.
+    assert completed_event.wait(2.0)
+    assert len(mock_subprocess) == 1
+
     response = client.get(f"/status/{arxiv_id}")
     status = response.json()
     
-    # The loop consumes all output, so it should be completed or near completed
+    # The loop consumes all output, then the PDF is uploaded and the task completes
     assert status["status"] == "completed"
-    assert status["progress"] == 100
-    assert status["message"] == "Done"
+    assert status["progress_percent"] == 100
+    assert status["message"] == "Processing complete."
     
     # We can inspect TASK_STATUS history if we stored it, but we only store current.
     # This test confirms the interactions pipeline works: API -> Background -> Subprocess Mock -> Status Dict -> API
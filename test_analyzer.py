@@ -5,27 +5,27 @@ import asyncio
 # Add project root to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'app', 'backend')))
 
-from arxiv_translator.downloader import download_source
-from arxiv_translator.extractor import extract_source
+from arxiv_translator.downloader import download_source, extract_source
 from arxiv_translator.analyzer import PaperAnalyzer
 
 async def test():
     arxiv_id = "2602.05400"
     work_dir = f"/tmp/workspace_{arxiv_id}"
-    os.makedirs(work_dir, exist_ok=True)
     
+    # Blocking steps run in worker threads so the event loop stays free.
+    # download_source creates work_dir itself.
     print(f"Downloading source for {arxiv_id}...")
-    tarball = download_source(arxiv_id, work_dir)
+    tarball = await asyncio.to_thread(download_source, arxiv_id, work_dir)
     print(f"Downloaded to {tarball}")
     
     print("Extracting...")
     source_dir = os.path.join(work_dir, "source")
-    extract_source(tarball, source_dir)
+    await asyncio.to_thread(extract_source, tarball, source_dir)
     print(f"Extracted to {source_dir}")
     
     print("Analyzing structure...")
     analyzer = PaperAnalyzer(source_dir)
-    struct = analyzer.analyze()
+    struct = await asyncio.to_thread(analyzer.analyze)
     print(f"Main TeX: {struct.main_tex}")
     
     print("All files:")
@@ -5,7 +5,10 @@ cmd = [
     "/opt/homebrew/share/google-cloud-sdk/bin/gcloud", "logging", "read",
     'resource.labels.service_name="readpaper-backend" AND textPayload:"Traceback"',
     "--project=gen-lang-client-0098594892",
-    "--format=json",
+    # Project to textPayload only; the other LogEntry fields are never read.
+    # (value(textPayload) would avoid JSON entirely, but tracebacks span several
+    # lines, so the JSON array is what keeps one entry together.)
+    "--format=json(textPayload)",
     "--limit=50"
 ]
 
@@ -1,15 +1,26 @@
 
 import sys
 import os
+import codecs
 import subprocess
 import shutil
+from collections import deque
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Translator subprocess environment, built once and shared by every launch.
+_ENV = {
+    **os.environ,
+    "PYTHONUNBUFFERED": "1",
+    "PYTHONPATH": BASE_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""),
+}
 
 def test_deepseek_r1_pdf_generation():
     arxiv_id = "2602.04705"
     url = f"https://arxiv.org/abs/{arxiv_id}"
     
     # Setup Paths
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    base_dir = BASE_DIR
     work_dir = os.path.join(base_dir, f"workspace_{arxiv_id}")
     
     # Clean previous run
@@ -25,41 +36,54 @@ def test_deepseek_r1_pdf_generation():
         "--model", "flash"
     ]
     
-    # Set env vars
-    env = os.environ.copy()
-    env["PYTHONUNBUFFERED"] = "1"
-    env["PYTHONPATH"] = base_dir + os.pathsep + env.get("PYTHONPATH", "")
-    
     # Run
-    # Warning: This is a long running process (real translation)
-    result = subprocess.run(cmd, env=env, capture_output=True, text=True, cwd=base_dir)
-    
-    print("STDOUT:", result.stdout)
-    print("STDERR:", result.stderr)
+    # Warning: This is a long running process (real translation).
+    # Stream output live instead of buffering it all; keep only the tail for
+    # the failure report.
+    # The pipe is read in binary 64 KiB chunks and decoded incrementally, so
+    # non-UTF-8 bytes in LaTeX logs can't raise and there's no per-line syscall.
+    tail = deque(maxlen=500)
+    decoder = codecs.getincrementaldecoder("utf-8")("replace")
+    pending = ""
+    proc = subprocess.Popen(
+        cmd, env=_ENV, cwd=base_dir,
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+    )
+    while True:
+        chunk = proc.stdout.read1(65536)
+        text = decoder.decode(chunk, final=not chunk)
+        sys.stdout.write(text)
+        lines = (pending + text).split("\n")
+        pending = lines.pop()
+        tail.extend(lines)
+        if not chunk:
+            break
+    if pending:
+        tail.append(pending)
+    returncode = proc.wait()
     
-    if result.returncode != 0:
-        print(f"Process failed with return code {result.returncode}")
+    if returncode != 0:
+        print(f"Process failed with return code {returncode}")
+        print("Last output:\n" + "\n".join(tail))
         sys.exit(1)
         
-    # Check for PDF
-    pdf_found = False
-    found_files = []
-    
-    if os.path.exists(work_dir):
-        for root, dirs, files in os.walk(work_dir):
-            for f in files:
-                found_files.append(f)
-                if f.endswith(".pdf"):
-                    print(f"Found PDF: {f}")
-                    if "_zh" in f:
-                        pdf_found = True
-    
-    print(f"Files in workspace: {found_files}")
+    # Check for PDF at the translator's known output path: it copies the
+    # compiled PDF to {arxiv_id}_zh.pdf in its working directory (base_dir).
+    final_pdf = os.path.join(base_dir, f"{arxiv_id}_zh.pdf")
     
-    if pdf_found:
+    if os.path.isfile(final_pdf):
+        print(f"Found PDF: {final_pdf}")
         print("SUCCESS: PDF was generated.")
     else:
         print("FAILURE: PDF not found.")
+        # Diagnostics only: show (the start of) what the workspace contains
+        found_files = []
+        if os.path.exists(work_dir):
+            for root, dirs, files in os.walk(work_dir):
+                found_files.extend(files)
+                if len(found_files) >= 50:
+                    break
+        print(f"Files in workspace: {found_files[:50]}")
         sys.exit(1)
 
 if __name__ == "__main__":
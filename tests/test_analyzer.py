@@ -0,0 +1,49 @@
+"""
+Tests for the paper structure analyzer.
+"""
+
+from app.backend.arxiv_translator import analyzer
+from app.backend.arxiv_translator.analyzer import PaperAnalyzer
+
+
+def _write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def test_analyze_classifies_files(tmp_path):
+    _write(tmp_path / "main.tex",
+           "\\documentclass{article}\n\\input{sections/intro}\n\\begin{document}\n\\include{body}\n\\end{document}\n")
+    _write(tmp_path / "sections" / "intro.tex", "Introduction text.\n")
+    _write(tmp_path / "body.tex", "Body text.\n")
+    _write(tmp_path / "macros.tex", "\\newcommand{\\R}{\\mathbb{R}}\n\\def\\x{x}\n")
+
+    structure = PaperAnalyzer(str(tmp_path)).analyze()
+
+    types = {info.rel_path: info.file_type for info in structure.files.values()}
+    assert types == {
+        "main.tex": "main",
+        "sections/intro.tex": "sub",
+        "body.tex": "sub",
+        "macros.tex": "macros",
+    }
+    assert structure.preamble.startswith("\\documentclass{article}")
+
+
+def test_analyze_reads_each_file_once(tmp_path, monkeypatch):
+    _write(tmp_path / "main.tex",
+           "\\documentclass{article}\n\\begin{document}\n\\input{a}\n\\input{b}\n\\end{document}\n")
+    _write(tmp_path / "a.tex", "A.\n")
+    _write(tmp_path / "b.tex", "B.\n")
+
+    reads = []
+    original_read = analyzer._read_file
+
+    def counting_read(path):
+        reads.append(path)
+        return original_read(path)
+
+    monkeypatch.setattr(analyzer, "_read_file", counting_read)
+    PaperAnalyzer(str(tmp_path)).analyze()
+
+    assert len(reads) == len(set(reads)) == 3
@@ -17,31 +17,19 @@ def cache_service(tmp_path):
     return TranslationCache(storage)
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def event_loop():
-    """Ensure each test gets a fresh event loop."""
+    """One event loop (and default thread pool) shared by the module's tests."""
     loop = asyncio.new_event_loop()
     yield loop
+    loop.run_until_complete(loop.shutdown_default_executor())
     loop.close()
 
 
-def run(coro, loop=None):
-    """Helper to run async functions in tests."""
-    if loop is None:
-        loop = asyncio.new_event_loop()
-    try:
-        return loop.run_until_complete(coro)
-    finally:
-        if loop is not None:
-            pass  # Don't close if passed in
-
-
 # ── Cache miss ────────────────────────────────────────────────────────────────
 
-def test_cache_miss_returns_none(cache_service):
-    result = asyncio.get_event_loop().run_until_complete(
-        cache_service.get_cached("2406.12345v1", "main.tex")
-    ) if asyncio.get_event_loop().is_running() else asyncio.run(
+def test_cache_miss_returns_none(cache_service, event_loop):
+    result = event_loop.run_until_complete(
         cache_service.get_cached("2406.12345v1", "main.tex")
     )
     assert result is None
@@ -54,7 +42,7 @@ def test_cache_miss_returns_none_simple(cache_service):
 
 # ── Cache put + get ───────────────────────────────────────────────────────────
 
-def test_cache_put_and_get(cache_service):
+def test_cache_put_and_get(cache_service, event_loop):
     content = r"\documentclass{article}\begin{document}你好\end{document}"
 
     async def _test():
@@ -62,12 +50,12 @@ def test_cache_put_and_get(cache_service):
         result = await cache_service.get_cached("2406.12345v1", "main.tex")
         assert result == content
 
-    asyncio.run(_test())
+    event_loop.run_until_complete(_test())
 
 
 # ── Invalid translations are NOT cached ───────────────────────────────────────
 
-def test_invalid_translation_not_cached(cache_service):
+def test_invalid_translation_not_cached(cache_service, event_loop):
     content = "partial content"
 
     async def _test():
@@ -75,12 +63,12 @@ def test_invalid_translation_not_cached(cache_service):
         result = await cache_service.get_cached("2406.12345v1", "main.tex")
         assert result is None  # Should not be cached
 
-    asyncio.run(_test())
+    event_loop.run_until_complete(_test())
 
 
 # ── Version isolation ─────────────────────────────────────────────────────────
 
-def test_version_isolation(cache_service):
+def test_version_isolation(cache_service, event_loop):
     content_v1 = r"\begin{document}Version 1 translation\end{document}"
     content_v2 = r"\begin{document}Version 2 translation\end{document}"
 
@@ -98,12 +86,12 @@ def test_version_isolation(cache_service):
         assert result_v2 == content_v2
         assert result_v1 != result_v2  # Different versions, different content
 
-    asyncio.run(_test())
+    event_loop.run_until_complete(_test())
 
 
 # ── Complete marking ──────────────────────────────────────────────────────────
 
-def test_mark_complete(cache_service):
+def test_mark_complete(cache_service, event_loop):
     async def _test():
         # Initially not complete
         assert not await cache_service.is_complete("2406.12345v1")
@@ -114,4 +102,108 @@ def test_mark_complete(cache_service):
 
         assert await cache_service.is_complete("2406.12345v1")
 
-    asyncio.run(_test())
+    event_loop.run_until_complete(_test())
+
+
+# ── Metadata log ──────────────────────────────────────────────────────────────
+
+def test_put_appends_to_meta_log(cache_service, event_loop, tmp_path):
+    async def _test():
+        await cache_service.put_cache("2406.12345v1", "main.tex", "a", is_valid=True, model="flash")
+        await cache_service.put_cache("2406.12345v1", "intro.tex", "b", is_valid=True, model="flash")
+
+        cache_dir = tmp_path / "_cache" / "2406.12345v1"
+        assert not (cache_dir / "meta.json").exists()
+        lines = (cache_dir / "meta.log").read_text(encoding="utf-8").splitlines()
+        assert [json.loads(l)["filename"] for l in lines] == ["main.tex", "intro.tex"]
+
+        assert await cache_service.get_cached("2406.12345v1", "intro.tex") == "b"
+
+    event_loop.run_until_complete(_test())
+
+
+
+def test_put_cache_many_appends_once(cache_service, event_loop, tmp_path, monkeypatch):
+    async def _test():
+        appends = []
+        original_append = cache_service.storage.append_file
+
+        async def counting_append(path, content):
+            appends.append(path)
+            return await original_append(path, content)
+
+        monkeypatch.setattr(cache_service.storage, "append_file", counting_append)
+
+        written = await cache_service.put_cache_many(
+            "2406.12345v1", {"main.tex": "a", "intro.tex": "b"}, model="flash"
+        )
+        assert sorted(written) == ["intro.tex", "main.tex"]
+        assert len(appends) == 1
+
+        assert await cache_service.get_cached_many(
+            "2406.12345v1", ["main.tex", "intro.tex"]
+        ) == {"main.tex": "a", "intro.tex": "b"}
+        assert await cache_service.put_cache_many("2406.12345v1", {}) == []
+
+    event_loop.run_until_complete(_test())
+
+
+def test_mark_complete_compacts_meta_log(cache_service, event_loop, tmp_path):
+    async def _test():
+        await cache_service.put_cache("2406.12345v1", "main.tex", "a", is_valid=True, model="flash")
+        await cache_service.put_cache("2406.12345v1", "intro.tex", "b", is_valid=True, model="flash")
+        await cache_service.mark_complete("2406.12345v1")
+
+        cache_dir = tmp_path / "_cache" / "2406.12345v1"
+        assert not (cache_dir / "meta.log").exists()
+        meta = json.loads((cache_dir / "meta.json").read_text(encoding="utf-8"))
+        assert meta["complete"] is True
+        assert meta["model"] == "flash"
+        assert set(meta["files"]) == {"main.tex", "intro.tex"}
+
+        assert await cache_service.get_cached("2406.12345v1", "main.tex") == "a"
+
+    event_loop.run_until_complete(_test())
+
+
+def test_meta_cache_reused_until_storage_changes(cache_service, event_loop, monkeypatch):
+    async def _test():
+        await cache_service.put_cache("2406.12345v1", "main.tex", "a", is_valid=True)
+        first = await cache_service._read_meta("2406.12345v1")
+
+        reads = []
+        original_read = cache_service.storage.read_file
+
+        async def counting_read(path):
+            reads.append(path)
+            return await original_read(path)
+
+        monkeypatch.setattr(cache_service.storage, "read_file", counting_read)
+
+        assert await cache_service._read_meta("2406.12345v1") is first
+        assert reads == []
+
+        await cache_service.put_cache("2406.12345v1", "intro.tex", "bb", is_valid=True)
+        meta = await cache_service._read_meta("2406.12345v1")
+        assert set(meta["files"]) == {"main.tex", "intro.tex"}
+        assert reads
+
+    event_loop.run_until_complete(_test())
+
+
+# ── Batched lookup ────────────────────────────────────────────────────────────
+
+def test_get_cached_many(cache_service, event_loop):
+    async def _test():
+        await cache_service.put_cache("2406.12345v1", "main.tex", "a", is_valid=True)
+        await cache_service.put_cache("2406.12345v1", "intro.tex", "b", is_valid=True)
+        await cache_service.put_cache("2406.12345v1", "bad.tex", "c", is_valid=False)
+
+        result = await cache_service.get_cached_many(
+            "2406.12345v1", ["main.tex", "intro.tex", "bad.tex", "missing.tex"]
+        )
+        assert result == {"main.tex": "a", "intro.tex": "b"}
+
+        assert await cache_service.get_cached_many("2406.99999v1", ["main.tex"]) == {}
+
+    event_loop.run_until_complete(_test())
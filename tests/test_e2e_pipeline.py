@@ -4,6 +4,7 @@ import shutil
 import pytest
 from unittest.mock import patch, MagicMock, AsyncMock
 from app.backend.arxiv_translator.main import main
+from app.backend.arxiv_translator.analyzer import PaperStructure
 import sys
 
 
@@ -38,7 +39,7 @@ def test_e2e_pipeline_mocked(
     mock_asyncio, mock_analyzer_cls,
     mock_clean, mock_compile_with_fix_loop,
     mock_translator_cls,
-    mock_extract, mock_download, mock_workspace
+    mock_extract, mock_download, mock_workspace, monkeypatch
 ):
     """
     Tests the simplified main() pipeline with mocked I/O.
@@ -56,7 +57,7 @@ def test_e2e_pipeline_mocked(
     source_zh_dir_placeholder = os.path.join(
         mock_workspace, "workspace_2401.00000", "source_zh"
     )
-    mock_structure = MagicMock()
+    mock_structure = MagicMock(spec=PaperStructure)
     mock_structure.main_tex = os.path.join(source_zh_dir_placeholder, "main.tex")
     mock_structure.translatable_files.return_value = [
         os.path.join(source_zh_dir_placeholder, "main.tex")
@@ -93,28 +94,22 @@ def test_e2e_pipeline_mocked(
     mock_asyncio.gather = real_asyncio.gather
 
     # ── Run ──────────────────────────────────────────────────────────────────
+    final_pdf_path = os.path.join(mock_workspace, "final.pdf")
     test_args = [
         "arxiv-translator",
         "https://arxiv.org/abs/2401.00000",
-        "--output", "final.pdf",
+        "--output", final_pdf_path,
         "--keep",
     ]
 
+    # The translator creates workspace_{id} relative to the CWD
+    monkeypatch.chdir(mock_workspace)
     with patch.object(sys, "argv", test_args):
-        original_cwd = os.getcwd()
-        os.chdir(mock_workspace)
-        try:
-            main()
-        finally:
-            os.chdir(original_cwd)
+        main()
 
     # ── Assertions ───────────────────────────────────────────────────────────
     mock_download.assert_called_once()
     mock_clean.assert_called_once()
     assert mock_compile_with_fix_loop.call_count == 1
 
-    final_pdf_path = os.path.join(mock_workspace, "final.pdf")
     assert os.path.exists(final_pdf_path), "Final output PDF should exist"
-
-    if os.path.exists(final_pdf_path):
-        os.remove(final_pdf_path)
@@ -184,3 +184,30 @@ def test_unbalanced_environments_rejected():
     is_valid, reason = validate_translation(original, translated, "main.tex")
     assert not is_valid
     assert "unbalanced" in reason.lower() or "environment" in reason.lower()
+
+
+# ── Original-side memoization ─────────────────────────────────────────────────
+
+def test_original_structure_counted_once_across_retries():
+    from app.backend.arxiv_translator.integrity import _original_structure
+
+    original = r"""
+\begin{document}
+\section{Intro} Text \cite{a} \cite{b} \cite{c} \cite{d}.
+\end{document}
+"""
+    truncated = r"""
+\begin{document}
+\section{引言} 文本 \cite{a}。
+\end{document}
+"""
+    complete = original.replace("Text", "文本")
+
+    _original_structure.cache_clear()
+    is_valid, reason = validate_translation(original, truncated, "main.tex")
+    assert not is_valid
+    assert reason.startswith(r"\cite count dropped")
+    assert validate_translation(original, complete, "main.tex") == (True, "")
+
+    info = _original_structure.cache_info()
+    assert (info.misses, info.hits) == (1, 1)
@@ -0,0 +1,149 @@
+"""
+Tests for the library manager.
+"""
+
+import asyncio
+
+from app.backend.services.library import LibraryManager
+from app.backend.services.storage import LocalStorageService
+
+
+def test_library_shared_across_instances(tmp_path, monkeypatch):
+    storage = LocalStorageService(str(tmp_path))
+
+    async def _test():
+        await LibraryManager(storage).add_paper(
+            "2406.12345", "flash", "Title", "Abstract", ["A. Author"], ["cs.CL"]
+        )
+
+        reads = []
+        original_read = storage.read_file
+
+        async def counting_read(path):
+            reads.append(path)
+            return await original_read(path)
+
+        monkeypatch.setattr(storage, "read_file", counting_read)
+
+        # A fresh manager (one per request) reuses the parsed library
+        papers = await LibraryManager(storage).list_papers()
+        assert [p["id"] for p in papers] == ["2406.12345"]
+        assert reads == []
+
+        # An external change to the library files is picked up
+        (tmp_path / "library.json").write_text("{}", encoding="utf-8")
+        (tmp_path / "library.log").unlink()
+        assert await LibraryManager(storage).list_papers() == []
+        assert reads == ["library.json"]
+
+    asyncio.run(_test())
+
+
+def test_library_mutations_append_to_log(tmp_path, monkeypatch):
+    from app.backend.services import library
+
+    monkeypatch.setattr(library, "LOG_COMPACT_THRESHOLD", 3)
+    storage = LocalStorageService(str(tmp_path))
+
+    async def _test():
+        lib = LibraryManager(storage)
+        await lib.add_paper("2406.00001", "flash", "One", "", [], [])
+        await lib.add_paper("2406.00002", "flash", "Two", "", [], [])
+        assert not (tmp_path / "library.json").exists()
+        assert len((tmp_path / "library.log").read_text().splitlines()) == 2
+
+        # Replayed by a fresh manager
+        library._LIBRARY_MEMO.clear()
+        papers = await LibraryManager(storage).list_papers()
+        assert {p["id"] for p in papers} == {"2406.00001", "2406.00002"}
+
+        # Third mutation compacts the log into library.json
+        await lib.delete_paper("2406.00001")
+        assert not (tmp_path / "library.log").exists()
+        assert (tmp_path / "library.json").exists()
+
+        library._LIBRARY_MEMO.clear()
+        papers = await LibraryManager(storage).list_papers()
+        assert [p["id"] for p in papers] == ["2406.00002"]
+
+    asyncio.run(_test())
+
+
+def test_library_concurrent_managers_do_not_lose_updates(tmp_path):
+    storage = LocalStorageService(str(tmp_path))
+
+    async def _test():
+        first, second = LibraryManager(storage), LibraryManager(storage)
+        # Both load the (empty) library before either writes
+        await first.list_papers()
+        await second.list_papers()
+
+        await first.add_paper("2406.00001", "flash", "One", "", [], [])
+        await second.add_paper("2406.00001", "pro", "One", "", [], [])
+        await second.add_paper("2406.00002", "flash", "Two", "", [], [])
+
+        papers = {p["id"]: p for p in await LibraryManager(storage).list_papers()}
+        assert set(papers) == {"2406.00001", "2406.00002"}
+        assert {v["model"] for v in papers["2406.00001"]["versions"]} == {"flash", "pro"}
+
+    asyncio.run(_test())
+
+
+def test_append_if_unchanged_rejects_stale_signature(tmp_path):
+    storage = LocalStorageService(str(tmp_path))
+
+    async def _test():
+        sig = await storage.append_if_unchanged("log", "a\n", None)
+        assert sig is not None
+        assert await storage.append_if_unchanged("log", "b\n", None) is None
+
+        assert await storage.append_if_unchanged("log", "c\n", sig) is not None
+        assert await storage.append_if_unchanged("log", "d\n", sig) is None
+        assert (tmp_path / "log").read_text() == "a\nc\n"
+
+        assert not await storage.delete_if_unchanged("log", sig)
+        assert await storage.delete_if_unchanged("log", await storage.stat("log"))
+        assert not (tmp_path / "log").exists()
+
+    asyncio.run(_test())
+
+
+def test_library_memo_is_bounded_and_not_shared_mutably(tmp_path, monkeypatch):
+    from app.backend.services import library
+
+    monkeypatch.setattr(library, "_LIBRARY_MEMO_SIZE", 2)
+    library._LIBRARY_MEMO.clear()
+
+    async def _test():
+        storages = [LocalStorageService(str(tmp_path / name)) for name in "abc"]
+        for storage in storages:
+            await LibraryManager(storage).add_paper("2406.00001", "flash", "One", "", [], [])
+        # Least recently used library evicted
+        assert list(library._LIBRARY_MEMO) == [s.uri("library.json") for s in storages[1:]]
+
+        reader, writer = LibraryManager(storages[2]), LibraryManager(storages[2])
+        await reader.list_papers()
+        await writer.add_paper("2406.00002", "flash", "Two", "", [], [])
+        # The reader's loaded view is not changed under it
+        assert [p["id"] for p in await reader.list_papers()] == ["2406.00001"]
+
+    asyncio.run(_test())
+
+
+def test_library_same_size_rewrite_within_mtime_tick(tmp_path):
+    import os
+
+    storage = LocalStorageService(str(tmp_path))
+
+    async def _test():
+        await storage.write_file("library.json", '{"2406.00001": {"id": "2406.00001"}}')
+        assert [p["id"] for p in await LibraryManager(storage).list_papers()] == ["2406.00001"]
+
+        # Same size, and a coarse-mtime filesystem reports the same timestamp
+        st = os.stat(tmp_path / "library.json")
+        await storage.write_file("library.json", '{"2406.00002": {"id": "2406.00002"}}')
+        os.utime(tmp_path / "library.json", ns=(st.st_atime_ns, st.st_mtime_ns))
+
+        assert [p["id"] for p in await LibraryManager(storage).list_papers()] == ["2406.00002"]
+
+    asyncio.run(_test())
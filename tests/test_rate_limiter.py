@@ -0,0 +1,45 @@
+"""
+Tests for the sliding-window rate limiter.
+"""
+
+from app.backend.services import rate_limiter
+from app.backend.services.rate_limiter import RateLimiter
+
+
+def test_rate_limit_window(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limiter.time, "time", lambda: now[0])
+    limiter = RateLimiter(max_requests=2, window_seconds=60)
+
+    assert limiter.check("alice") == (True, 1)
+    assert limiter.check("alice") == (True, 0)
+    assert limiter.check("alice") == (False, 0)
+    # Other users are tracked separately
+    assert limiter.check("bob") == (True, 1)
+
+    # Oldest request slides out of the window
+    now[0] += 61
+    assert limiter.check("alice") == (True, 1)
+
+
+def test_rate_limit_gc_drops_idle_users(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limiter.time, "time", lambda: now[0])
+    limiter = RateLimiter(max_requests=2, window_seconds=60)
+
+    limiter.check("alice")
+    now[0] += 120
+    limiter.check("bob")
+
+    assert "alice" not in limiter._requests
+    assert "bob" in limiter._requests
+
+
+def test_rate_limit_concurrent_checks():
+    from concurrent.futures import ThreadPoolExecutor
+
+    limiter = RateLimiter(max_requests=5, window_seconds=60)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: limiter.check("alice")[0], range(50)))
+
+    assert results.count(True) == 5
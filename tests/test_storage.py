@@ -0,0 +1,105 @@
+"""
+Tests for the storage backends.
+"""
+
+import os
+
+import pytest
+
+from app.backend.services.storage import LocalStorageService
+
+
+def test_local_list_files(tmp_path):
+    storage = LocalStorageService(str(tmp_path))
+    (tmp_path / "2406.12345" / "src").mkdir(parents=True)
+    (tmp_path / "2406.12345" / "src" / "main.tex").write_text("x")
+    (tmp_path / "2406.12345" / "paper.pdf").write_text("x")
+    (tmp_path / "library.json").write_text("{}")
+
+    assert sorted(storage.list_files()) == [
+        os.path.join("2406.12345", "paper.pdf"),
+        os.path.join("2406.12345", "src", "main.tex"),
+        "library.json",
+    ]
+    assert sorted(storage.list_files("2406.12345")) == [
+        os.path.join("2406.12345", "paper.pdf"),
+        os.path.join("2406.12345", "src", "main.tex"),
+    ]
+    assert storage.list_files("missing") == []
+
+
+def test_local_path_traversal_rejected(tmp_path):
+    storage = LocalStorageService(str(tmp_path / "users" / "alice"))
+    assert storage._get_full_path("2406.12345/main.tex") == str(
+        tmp_path / "users" / "alice" / "2406.12345" / "main.tex"
+    )
+    with pytest.raises(ValueError):
+        storage._get_full_path("../bob/library.json")
+    # Sibling directory sharing the base path as a string prefix
+    with pytest.raises(ValueError):
+        storage._get_full_path("../alice2/library.json")
+
+
+def test_local_stat_prefix(tmp_path):
+    import asyncio
+
+    storage = LocalStorageService(str(tmp_path))
+    (tmp_path / "_cache" / "2406.12345v1").mkdir(parents=True)
+    (tmp_path / "_cache" / "2406.12345v1" / "main.tex").write_text("abc")
+    (tmp_path / "_cache" / "2406.12345v2").mkdir(parents=True)
+    (tmp_path / "_cache" / "2406.12345v2" / "main.tex").write_text("x")
+
+    listing = asyncio.run(storage.stat_prefix("_cache/2406.12345v1/"))
+    assert list(listing) == ["_cache/2406.12345v1/main.tex"]
+    assert listing["_cache/2406.12345v1/main.tex"] == asyncio.run(
+        storage.stat("_cache/2406.12345v1/main.tex")
+    )
+    assert asyncio.run(storage.stat_prefix("_cache/missing/")) == {}
+
+
+def test_local_write_is_atomic_replace(tmp_path):
+    import asyncio
+
+    storage = LocalStorageService(str(tmp_path))
+    asyncio.run(storage.write_file("library.json", '{"a": 1}'))
+    asyncio.run(storage.write_bytes("library.json", b'{"b": 2}'))
+
+    assert (tmp_path / "library.json").read_text() == '{"b": 2}'
+    # No temp files left behind
+    assert os.listdir(tmp_path) == ["library.json"]
+
+
+def test_gcs_append_part_outside_listed_prefixes():
+    import asyncio
+    from unittest.mock import MagicMock
+
+    from google.api_core.exceptions import PreconditionFailed
+
+    from app.backend.services.storage import GCSStorageService
+
+    blobs = {}
+    bucket = MagicMock()
+    bucket.name = "bucket"
+    bucket.blob.side_effect = lambda name: blobs.setdefault(name, MagicMock(name=name))
+    service = GCSStorageService._from_client(MagicMock(), bucket, "users/alice/")
+
+    log_name = "users/alice/_cache/2406.12345v1/meta.log"
+    log = bucket.blob(log_name)
+    log.compose.side_effect = PreconditionFailed("generation changed")
+
+    signature = (7, 10, 1)
+    assert asyncio.run(service.append_if_unchanged("_cache/2406.12345v1/meta.log", "x\n", signature)) is None
+
+    parts = [name for name in blobs if name != log_name]
+    assert len(parts) == 1 and parts[0].startswith("_tmp/append-parts/")
+    # Deleted even though the compose failed
+    blobs[parts[0]].delete.assert_called_once()
+
+    # A leftover part is never reported by a listing
+    leftover = MagicMock()
+    leftover.name = parts[0]
+    cached = MagicMock(generation=1, size=3, component_count=None)
+    cached.name = "users/alice/_cache/2406.12345v1/main.tex"
+    service.client.list_blobs.return_value = [leftover, cached]
+    assert service.list_files() == ["_cache/2406.12345v1/main.tex"]
+    assert list(asyncio.run(service.stat_prefix(""))) == ["_cache/2406.12345v1/main.tex"]
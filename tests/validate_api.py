@@ -5,88 +5,157 @@ Tests all 3 arxiv papers end-to-end via Cloud Run backend.
 """
 import sys
 import os
-import time
+import io
 import json
-import urllib.request
-import urllib.error
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 
 BACKEND = "https://readpaper-backend-989182646968.us-central1.run.app"
 
+# /status polling interval bounds (seconds)
+POLL_MIN_INTERVAL = 0.1
+POLL_MAX_INTERVAL = 2.0
+
 CASES = [
     {"arxiv_id": "1706.03762", "deepdive": False, "name": "Case 1 — Attention Is All You Need"},
     {"arxiv_id": "2310.06825", "deepdive": True,  "name": "Case 2 — Mistral 7B + DeepDive"},
     {"arxiv_id": "2602.04705", "deepdive": False, "name": "Case 3 — DeepSeek-R1 (multi-file)"},
 ]
 
+# One keep-alive session for every call: each /status poll reuses a pooled
+# TLS connection instead of a fresh handshake. Cases run in parallel threads,
+# so the pool is sized to hold one connection per worker.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+
+# When cases run concurrently, each worker thread collects its output in
+# _report.buf and prints it in one piece when the case ends.
+_report = threading.local()
+_print_lock = threading.Lock()
+
+
+def out(msg=""):
+    buf = getattr(_report, "buf", None)
+    if buf is not None:
+        buf.write(msg + "\n")
+    else:
+        print(msg)
+
+
 def req(url, data=None):
-    headers = {"Content-Type": "application/json"}
-    req_obj = urllib.request.Request(
-        url,
-        data=json.dumps(data).encode() if data else None,
-        headers=headers
-    )
     try:
-        with urllib.request.urlopen(req_obj, timeout=30) as r:
-            return r.status, json.loads(r.read())
-    except urllib.error.HTTPError as e:
-        return e.code, {}
+        if data is not None:
+            r = SESSION.post(url, json=data, timeout=30)
+        else:
+            r = SESSION.get(url, timeout=30)
+        if not r.ok:
+            return r.status_code, {}
+        return r.status_code, r.json()
     except Exception as e:
         return -1, {"error": str(e)}
 
 
 def run_case(case):
-    print(f"\n{'='*60}")
-    print(f"  {case['name']}")
-    print(f"  arxiv_id={case['arxiv_id']}  deepdive={case['deepdive']}")
-    print(f"{'='*60}")
+    out(f"\n{'='*60}")
+    out(f"  {case['name']}")
+    out(f"  arxiv_id={case['arxiv_id']}  deepdive={case['deepdive']}")
+    out(f"{'='*60}")
 
     arxiv_id = case["arxiv_id"]
     url = f"https://arxiv.org/abs/{arxiv_id}"
 
-    print(f"  → POST /translate ...")
+    out(f"  → POST /translate ...")
     status_code, resp = req(
         f"{BACKEND}/translate",
         data={"arxiv_url": url, "model": "flash", "deepdive": case["deepdive"]}
     )
-    print(f"    Response ({status_code}): {str(resp)[:200]}")
+    out(f"    Response ({status_code}): {str(resp)[:200]}")
 
     if status_code not in (200, 202):
-        print(f"  ❌ /translate failed with {status_code}")
+        out(f"  ❌ /translate failed with {status_code}")
         return False
 
-    # Poll /status
-    print(f"  → Polling /status/{arxiv_id} ...")
     start = time.time()
-    last_msg = ""
-    last_pct = -1
-
-    for attempt in range(360):  # max 30 min @ 5s interval
-        time.sleep(5)
-        s, data = req(f"{BACKEND}/status/{arxiv_id}")
-        if s != 200:
-            if attempt % 10 == 0:
-                print(f"    [poll {attempt}] HTTP {s}")
-            continue
+    deadline = start + 30 * 60
+    last = {"msg": "", "pct": -1}
 
+    def report(data):
+        """Print a status update; return True/False once the task is terminal, else None."""
         st = data.get("status", "?")
         msg = data.get("message", "")
         pct = data.get("progress_percent", 0)
         elapsed = int(time.time() - start)
 
-        if msg != last_msg or pct != last_pct:
-            print(f"    [{elapsed:5d}s] {st:12s} | {pct:3d}% | {msg}")
-            last_msg = msg
-            last_pct = pct
+        if msg != last["msg"] or pct != last["pct"]:
+            out(f"    [{elapsed:5d}s] {st:12s} | {pct:3d}% | {msg}")
+            last["msg"] = msg
+            last["pct"] = pct
 
         if st == "completed":
-            print(f"\n  ✅ COMPLETED in {elapsed}s")
+            out(f"\n  ✅ COMPLETED in {elapsed}s")
             return True
         elif st == "failed":
             error_msg = data.get("message", data.get("compile_log", ""))
-            print(f"\n  ❌ FAILED: {error_msg}")
+            out(f"\n  ❌ FAILED: {error_msg}")
             return False
+        return None
+
+    # Prefer the server-sent event stream: the backend pushes each status
+    # change, so there is no poll latency at all.
+    out(f"  → Streaming /status/{arxiv_id}/events ...")
+    try:
+        with SESSION.get(f"{BACKEND}/status/{arxiv_id}/events", stream=True,
+                         timeout=(30, 60)) as r:
+            if r.ok:
+                for line in r.iter_lines():
+                    if not line.startswith(b"data:"):
+                        continue
+                    outcome = report(json.loads(line[5:]))
+                    if outcome is not None:
+                        return outcome
+    except (requests.RequestException, ValueError) as e:
+        out(f"    Event stream unavailable ({e}); falling back to polling")
+
+    # Fallback: poll /status with exponential backoff: start fast, back off to
+    # 2s while nothing changes, snap back to fast polling on every state change.
+    out(f"  → Polling /status/{arxiv_id} ...")
+    interval = POLL_MIN_INTERVAL
+    attempt = 0
+    etag = None
+
+    while time.time() < deadline:
+        time.sleep(interval)
+        interval = min(interval * 1.5, POLL_MAX_INTERVAL)
+        attempt += 1
+        # Conditional GET: an unchanged status comes back as an empty 304
+        try:
+            r = SESSION.get(f"{BACKEND}/status/{arxiv_id}", timeout=30,
+                            headers={"If-None-Match": etag} if etag else None)
+            s = r.status_code
+            if s == 304:
+                continue
+            data = r.json() if s == 200 else {}
+            etag = r.headers.get("ETag", etag)
+        except Exception:
+            s = -1
+        if s != 200:
+            if attempt % 10 == 0:
+                out(f"    [poll {attempt}] HTTP {s}")
+            continue
+
+        pct_before = last["pct"]
+        msg_before = last["msg"]
+        outcome = report(data)
+        if outcome is not None:
+            return outcome
+        if last["msg"] != msg_before or last["pct"] != pct_before:
+            interval = POLL_MIN_INTERVAL
 
-    print(f"\n  ❌ TIMEOUT after 30 minutes (last: {last_msg} {last_pct}%)")
+    out(f"\n  ❌ TIMEOUT after 30 minutes (last: {last['msg']} {last['pct']}%)")
     return False
 
 
@@ -98,10 +167,26 @@ if __name__ == "__main__":
     s, h = req(f"{BACKEND}/")
     print(f"Root endpoint ({s}): {str(h)[:100]}")
 
-    results = []
-    for case in CASES:
-        passed = run_case(case)
-        results.append((case["name"], passed))
+    # Each case is HTTP polling, so run them concurrently (E2E_PARALLEL=1 for
+    # sequential, live output). A case's log is printed whole when it
+    # finishes; results keep the CASES order.
+    workers = int(os.getenv("E2E_PARALLEL", str(len(CASES))))
+
+    def run_buffered(case):
+        if workers > 1:
+            _report.buf = io.StringIO()
+        try:
+            return run_case(case)
+        finally:
+            buf = getattr(_report, "buf", None)
+            if buf is not None:
+                _report.buf = None
+                with _print_lock:
+                    print(buf.getvalue(), end="", flush=True)
+
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        outcomes = list(ex.map(run_buffered, CASES))
+    results = [(case["name"], passed) for case, passed in zip(CASES, outcomes)]
 
     print(f"\n{'='*60}")
     print("FINAL RESULTS")
@@ -13,12 +13,16 @@ Requirements: .env with GEMINI_API_KEY set, TeX Live installed locally OR
               run inside the Docker container.
 """
 
+import io
 import os
 import sys
 import subprocess
 import shutil
+import threading
 import time
+from collections import deque
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Optional
 
@@ -56,20 +60,32 @@ TEST_CASES = [
 ]
 
 # ── Helpers ──────────────────────────────────────────────────────────────────
+# When cases run concurrently, each worker thread collects its report in
+# _report.buf and prints it in one piece when the case ends, so reports don't interleave.
+_report = threading.local()
+_print_lock = threading.Lock()
+
+def out(msg: str = ""):
+    buf = getattr(_report, "buf", None)
+    if buf is not None:
+        buf.write(msg + "\n")
+    else:
+        print(msg)
+
 def banner(msg: str):
-    print(f"\n{'='*70}")
-    print(f"  {msg}")
-    print(f"{'='*70}")
+    out(f"\n{'='*70}")
+    out(f"  {msg}")
+    out(f"{'='*70}")
 
 def section(msg: str):
-    print(f"\n── {msg}")
+    out(f"\n── {msg}")
 
-def ok(msg: str):   print(f"  ✅ {msg}")
-def fail(msg: str): print(f"  ❌ {msg}")
-def info(msg: str): print(f"  ℹ  {msg}")
+def ok(msg: str):   out(f"  ✅ {msg}")
+def fail(msg: str): out(f"  ❌ {msg}")
+def info(msg: str): out(f"  ℹ  {msg}")
 
 
-def run_case(tc: TestCase) -> dict:
+def run_case(tc: TestCase, env: dict) -> dict:
     """
     Run a single test case through the real arxiv_translator pipeline.
     Returns a result dict with pass/fail and details.
@@ -83,12 +99,20 @@ def run_case(tc: TestCase) -> dict:
     expected_pdf = BASE_DIR / f"{tc.arxiv_id}{suffix}.pdf"
     results_pdf  = RESULTS_DIR / f"{tc.arxiv_id}{suffix}.pdf"
 
-    # Clean previous run
+    # Clean previous run, but keep the downloaded tarball and its pristine
+    # extraction: the translator (run with --keep) reuses both instead of
+    # fetching the same arXiv source again.
     if work_dir.exists():
-        info(f"Removing old workspace: {work_dir}")
-        shutil.rmtree(work_dir)
-    if expected_pdf.exists():
-        expected_pdf.unlink()
+        keep = {f"{tc.arxiv_id}.tar.gz", "source"}
+        info(f"Cleaning old workspace (keeping cached source): {work_dir}")
+        for entry in work_dir.iterdir():
+            if entry.name in keep:
+                continue
+            if entry.is_dir() and not entry.is_symlink():
+                shutil.rmtree(entry)
+            else:
+                entry.unlink()
+    expected_pdf.unlink(missing_ok=True)
 
     # Build command
     cmd = [
@@ -100,72 +124,120 @@ def run_case(tc: TestCase) -> dict:
     if tc.deepdive:
         cmd.append("--deepdive")
 
-    env = os.environ.copy()
-    env["PYTHONUNBUFFERED"] = "1"
-    env["PYTHONPATH"] = str(BASE_DIR) + os.pathsep + env.get("PYTHONPATH", "")
-
     section(f"Running: {' '.join(cmd)}")
     start = time.time()
 
-    result = subprocess.run(
+    # Stream the translator's output instead of buffering all of it until exit:
+    # IPC progress is echoed live, only a bounded tail is kept for the report,
+    # and a PROGRESS:FAILED line ends the run right away.
+    proc = subprocess.Popen(
         cmd,
         env=env,
         cwd=str(BASE_DIR),
-        capture_output=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        bufsize=1,
         text=True,
-        timeout=900,   # 15-minute hard limit per paper
     )
+    stdout_tail: deque = deque(maxlen=2000)
+    stderr_tail: deque = deque(maxlen=30)
+    seen = {"completed": False, "with_warnings": False, "deepdive": False, "failed": False}
+
+    def read_stdout():
+        for line in proc.stdout:
+            line = line.rstrip("\n")
+            if not line.strip():
+                continue
+            stdout_tail.append(line)
+            if "deepdive" in line.lower() or "ANALYZING" in line:
+                seen["deepdive"] = True
+            if line.startswith("PROGRESS:"):
+                with _print_lock:
+                    print(f"    [{tc.arxiv_id}] {line[:160]}", flush=True)
+                if line.startswith("PROGRESS:COMPLETED_WITH_WARNINGS"):
+                    seen["with_warnings"] = True
+                elif line.startswith("PROGRESS:COMPLETED"):
+                    seen["completed"] = True
+                elif line.startswith("PROGRESS:FAILED"):
+                    seen["failed"] = True
+                    proc.kill()   # terminal: no point waiting for the rest
+
+    def read_stderr():
+        for line in proc.stderr:
+            stderr_tail.append(line.rstrip("\n"))
+
+    readers = [threading.Thread(target=read_stdout, daemon=True),
+               threading.Thread(target=read_stderr, daemon=True)]
+    for t in readers:
+        t.start()
+    try:
+        returncode = proc.wait(timeout=900)   # 15-minute hard limit per paper
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        raise
+    finally:
+        for t in readers:
+            t.join()
 
     elapsed = time.time() - start
-    section(f"Finished in {elapsed:.1f}s (exit code: {result.returncode})")
+    section(f"Finished in {elapsed:.1f}s (exit code: {returncode})")
 
     # ── Print stdout IPC messages (log_ipc goes to stdout) ──
-    ipc_lines = [l for l in result.stdout.splitlines() if l.strip()]
-    if ipc_lines:
-        print("\n  IPC messages (stdout):")
-        for l in ipc_lines[-40:]:   # last 40 lines
-            print(f"    {l}")
+    if stdout_tail:
+        out("\n  IPC messages (stdout):")
+        for l in list(stdout_tail)[-40:]:   # last 40 lines
+            out(f"    {l}")
 
     # ── Print last stderr lines on failure ──
-    if result.returncode != 0:
-        stderr_tail = result.stderr.splitlines()[-30:]
-        print("\n  STDERR (last 30 lines):")
+    if returncode != 0 or seen["failed"]:
+        out("\n  STDERR (last 30 lines):")
         for l in stderr_tail:
-            print(f"    {l}")
+            out(f"    {l}")
 
     # ── Verify outputs ──
     section("Validating outputs")
     passed = True
 
     # 1. Exit code
-    if result.returncode == 0:
+    if returncode == 0 and not seen["failed"]:
         ok("Process exited cleanly (code 0)")
+    elif seen["failed"]:
+        fail(f"PROGRESS:FAILED emitted — run stopped early (exit code {returncode})")
+        passed = False
     else:
-        fail(f"Process failed with exit code {result.returncode}")
+        fail(f"Process failed with exit code {returncode}")
         passed = False
 
     # 2. COMPLETED IPC in stdout
-    if "PROGRESS:COMPLETED" in result.stdout:
+    if seen["completed"]:
         ok("IPC COMPLETED signal emitted")
-    elif "PROGRESS:COMPLETED_WITH_WARNINGS" in result.stdout:
+    elif seen["with_warnings"]:
         ok("IPC COMPLETED_WITH_WARNINGS signal emitted (some segments kept in English)")
     else:
         fail("No PROGRESS:COMPLETED signal in stdout")
         passed = False
 
     # 3. PDF file exists and is non-trivial
-    pdf_to_check: Optional[Path] = None
-    if expected_pdf.exists():
-        pdf_to_check = expected_pdf
-    else:
-        # Sometimes the PDF is inside the workspace
-        for candidate in work_dir.rglob("*.pdf") if work_dir.exists() else []:
-            if "_zh" in candidate.name or candidate.name.endswith(".pdf"):
-                pdf_to_check = candidate
-                break
-
-    if pdf_to_check and pdf_to_check.exists():
-        size_kb = pdf_to_check.stat().st_size / 1024
+    # One stat per candidate gives both existence and size.
+    def stat_or_none(path: Path) -> Optional[os.stat_result]:
+        try:
+            return path.stat()
+        except FileNotFoundError:
+            return None
+
+    pdf_to_check: Optional[Path] = expected_pdf
+    pdf_stat = stat_or_none(expected_pdf)
+    if pdf_stat is None:
+        # Sometimes the PDF is only in the workspace: the compiler leaves it
+        # at the top of source_zh/, so there is no need to walk source/ or
+        # the figure directories.
+        candidates = sorted((work_dir / "source_zh").glob("*.pdf"))
+        pdf_to_check = candidates[0] if candidates else None
+        pdf_stat = stat_or_none(pdf_to_check) if pdf_to_check else None
+
+    if pdf_stat is not None:
+        size_kb = pdf_stat.st_size / 1024
         if size_kb > 5:
             ok(f"PDF found: {pdf_to_check.name} ({size_kb:.1f} KB)")
             # Copy to results dir for inspection
@@ -194,7 +266,7 @@ def run_case(tc: TestCase) -> dict:
 
     # 5. If DeepDive: check deepdive output in stdout
     if tc.deepdive:
-        if "deepdive" in result.stdout.lower() or "ANALYZING" in result.stdout:
+        if seen["deepdive"]:
             ok("DeepDive analysis output detected in stdout")
         else:
             fail("No DeepDive analysis output found in stdout — --deepdive may have been ignored")
@@ -206,8 +278,8 @@ def run_case(tc: TestCase) -> dict:
         "deepdive": tc.deepdive,
         "passed": passed,
         "elapsed_s": round(elapsed, 1),
-        "exit_code": result.returncode,
-        "pdf_path": str(pdf_to_check) if pdf_to_check and pdf_to_check.exists() else None,
+        "exit_code": returncode,
+        "pdf_path": str(pdf_to_check) if pdf_stat is not None else None,
     }
 
 
@@ -227,19 +299,46 @@ def main():
         sys.exit(1)
     ok(f"GEMINI_API_KEY found ({api_key[:8]}...)")
 
-    results = []
-    for tc in TEST_CASES:
+    # Translator subprocess environment: built once (after .env is loaded)
+    # and shared by every test case.
+    env = {
+        **os.environ,
+        "PYTHONUNBUFFERED": "1",
+        "PYTHONPATH": str(BASE_DIR) + os.pathsep + os.environ.get("PYTHONPATH", ""),
+    }
+
+    # Each case is its own translator subprocess with its own workspace, so run
+    # them concurrently (E2E_PARALLEL=1 for sequential, readable output);
+    # results keep the TEST_CASES order. Threads are enough: the work happens
+    # in the child processes, the workers only wait on pipes.
+    workers = int(os.getenv("E2E_PARALLEL", str(len(TEST_CASES))))
+
+    def run_guarded(tc: TestCase) -> dict:
+        if workers > 1:
+            _report.buf = io.StringIO()
         try:
-            r = run_case(tc)
+            return run_case_checked(tc)
+        finally:
+            buf = getattr(_report, "buf", None)
+            if buf is not None:
+                _report.buf = None
+                with _print_lock:
+                    print(buf.getvalue(), end="", flush=True)
+
+    def run_case_checked(tc: TestCase) -> dict:
+        try:
+            return run_case(tc, env)
         except subprocess.TimeoutExpired:
             fail(f"TIMEOUT: Case '{tc.name}' exceeded 15 minutes")
-            r = {"case": tc.name, "arxiv_id": tc.arxiv_id, "passed": False,
-                 "elapsed_s": 900, "exit_code": -1, "pdf_path": None, "deepdive": tc.deepdive}
+            return {"case": tc.name, "arxiv_id": tc.arxiv_id, "passed": False,
+                    "elapsed_s": 900, "exit_code": -1, "pdf_path": None, "deepdive": tc.deepdive}
         except Exception as e:
             fail(f"UNEXPECTED ERROR in case '{tc.name}': {e}")
-            r = {"case": tc.name, "arxiv_id": tc.arxiv_id, "passed": False,
-                 "elapsed_s": 0, "exit_code": -1, "pdf_path": None, "deepdive": tc.deepdive}
-        results.append(r)
+            return {"case": tc.name, "arxiv_id": tc.arxiv_id, "passed": False,
+                    "elapsed_s": 0, "exit_code": -1, "pdf_path": None, "deepdive": tc.deepdive}
+
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        results = list(ex.map(run_guarded, TEST_CASES))
 
     # ── Summary ──
     banner("VALIDATION SUMMARY")